@@ -0,0 +1,172 @@
+import json
+import sys
+from multiprocessing import Pool, get_start_method
+
+from graph import load_graph, path_from_tree, search, search_tree
+
+# Graph used to answer queries, loaded once and inherited by workers
+graph = None
+
+
+def main():
+    args = sys.argv[1:]
+    workers = 1
+    if "--workers" in args:
+        i = args.index("--workers")
+        try:
+            workers = int(args[i + 1])
+        except (IndexError, ValueError):
+            sys.exit("--workers needs a number")
+        del args[i:i + 2]
+    if len(args) not in (1, 2):
+        sys.exit("Usage: python batch.py [--workers N] directory [queries]")
+    directory = args[0]
+
+    # Each query line is "source name<TAB>target name"
+    if len(args) == 2:
+        with open(args[1], encoding="utf-8") as f:
+            queries = read_queries(f)
+    else:
+        queries = read_queries(sys.stdin)
+
+    for result in run_batch(directory, queries, workers):
+        print(json.dumps(result))
+
+
+def read_queries(lines):
+    """
+    Returns a list of (source name, target name) pairs,
+    one per tab-separated line, skipping blank lines.
+    """
+    queries = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        source, _, target = line.partition("\t")
+        queries.append((source.strip(), target.strip()))
+    return queries
+
+
+def run_batch(directory, queries, workers=1):
+    """
+    Answers every (source name, target name) query, loading the graph once
+    and sharing one search tree among queries whose source names resolve
+    to the same person. Returns the results in the same order as `queries`.
+    """
+    # Loading here writes the snapshot, so workers never parse the CSVs
+    init_worker(directory)
+
+    # Resolve each distinct name once, then group queries by source person
+    resolved = {}
+    results = [None] * len(queries)
+    groups = {}
+    for i, (source_name, target_name) in enumerate(queries):
+        for name in (source_name, target_name):
+            if name not in resolved:
+                resolved[name] = resolve(name)
+        source, error = resolved[source_name]
+        if source is None:
+            results[i] = failure(source_name, target_name, error)
+            continue
+        target, error = resolved[target_name]
+        if target is None:
+            results[i] = failure(source_name, target_name, error)
+            continue
+        groups.setdefault(source, []).append(
+            (i, source_name, target_name, target)
+        )
+    tasks = list(groups.items())
+
+    if workers > 1:
+        # Forked workers share the graph already loaded here; other start
+        # methods load it again, from the snapshot
+        if get_start_method() == "fork":
+            pool = Pool(workers)
+        else:
+            pool = Pool(workers, initializer=init_worker,
+                        initargs=(directory,))
+        with pool:
+            for answers in pool.imap_unordered(answer_group, tasks):
+                for i, result in answers:
+                    results[i] = result
+    else:
+        for task in tasks:
+            for i, result in answer_group(task):
+                results[i] = result
+    return results
+
+
+def init_worker(directory):
+    global graph
+    graph = load_graph(directory)
+
+
+def answer_group(task):
+    """
+    Answers all queries that share one source person, given as that
+    person's index and a list of (query position, source name, target
+    name, target index). Returns a list of (query position, result dict)
+    pairs.
+    """
+    source, queries = task
+
+    # A single target can stop early; several share one full tree
+    tree = graph.trees.get(source)
+    if tree is None and len(queries) > 1:
+        tree = search_tree(graph, source)
+
+    answers = []
+    for i, source_name, target_name, target in queries:
+        if tree is None:
+            path = search(graph, source, target)
+        else:
+            path = path_from_tree(tree, source, target)
+        answers.append((i, success(source_name, target_name, path)))
+    return answers
+
+
+def resolve(name):
+    """
+    Returns (person index, None) for a name, or its closest spelling,
+    or (None, error message) if the name is unknown or ambiguous.
+    """
+    people = graph.names.get(name.lower(), [])
+    if len(people) == 0:
+        # Accept the closest spelling so slight misspellings still resolve
+        matches = graph.name_index.fuzzy(name, limit=1)
+        if len(matches) == 0:
+            return None, "Person not found."
+        return resolve(matches[0])
+    elif len(people) > 1:
+        ids = ", ".join(graph.person_ids[person] for person in people)
+        return None, f"Ambiguous name, candidate IDs: {ids}"
+    return people[0], None
+
+
+def success(source_name, target_name, path):
+    if path is None:
+        return {"source": source_name, "target": target_name,
+                "degrees": None, "path": None}
+    return {
+        "source": source_name,
+        "target": target_name,
+        "degrees": len(path),
+        "path": [
+            {
+                "movie_id": graph.movie_ids[movie],
+                "movie": graph.movie_titles[movie],
+                "person_id": graph.person_ids[person],
+                "person": graph.person_names[person]
+            }
+            for movie, person in path
+        ]
+    }
+
+
+def failure(source_name, target_name, error):
+    return {"source": source_name, "target": target_name, "error": error}
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import random
+import sys
+import time
+import tracemalloc
+
+import degrees
+import graph as csr
+from util import QueueFrontier, DequeQueueFrontier
+
+# Seed and number of queries per category, fixed so runs are comparable
+SEED = 50
+QUERIES_PER_CATEGORY = 5
+
+# Pairs sampled while looking for queries of each category
+MAX_CANDIDATES = 5000
+
+# Paths of at most SHORT degrees count as short, at least LONG as long
+SHORT = 2
+LONG = 4
+
+CATEGORIES = ["short", "long", "unreachable"]
+
+
+def main():
+    args = sys.argv[1:]
+    engines = list(ENGINES)
+    if "--engines" in args:
+        i = args.index("--engines")
+        if i + 1 >= len(args):
+            sys.exit("--engines needs a comma-separated list")
+        engines = args[i + 1].split(",")
+        del args[i:i + 2]
+        for engine in engines:
+            if engine not in ENGINES:
+                sys.exit(f"Unknown engine '{engine}', "
+                         f"choose from {', '.join(ENGINES)}")
+    directories = args if args else ["small", "large"]
+
+    mismatches = 0
+    for directory in directories:
+        print(f"Loading {directory}...")
+        data = Dataset(directory)
+        queries = pick_queries(data.graph)
+        print(f"{'category':<12} {'engine':<14} {'degrees':>7} "
+              f"{'expanded':>9} {'ms':>10} {'peak KB':>9}")
+        for category, source, target in queries:
+            lengths = set()
+            for engine in engines:
+                length, expanded, seconds, peak = measure(
+                    data, engine, source, target
+                )
+                lengths.add(length)
+                print(f"{category:<12} {engine:<14} {str(length):>7} "
+                      f"{expanded:>9} {seconds * 1000:>10.2f} "
+                      f"{peak / 1024:>9.1f}")
+            if len(lengths) > 1:
+                mismatches += 1
+                print(f"MISMATCH: engines disagree on path length "
+                      f"from {source} to {target}: {lengths}")
+        print()
+
+    if mismatches:
+        sys.exit(f"{mismatches} queries had mismatched path lengths.")
+
+
+class Dataset():
+    """
+    One data directory loaded both as degrees' dicts and as a CSR graph.
+    """
+    def __init__(self, directory):
+        degrees.names = self.names = {}
+        degrees.people = self.people = {}
+        degrees.movies = self.movies = {}
+        degrees.load_data(directory)
+
+        self.graph = csr.load_graph(directory)
+        # Precomputed trees would turn searches into lookups
+        self.graph.trees = {}
+
+    def activate(self):
+        """
+        Points degrees' module-level dicts at this dataset.
+        """
+        degrees.names = self.names
+        degrees.people = self.people
+        degrees.movies = self.movies
+
+
+def pick_queries(graph):
+    """
+    Returns a seeded list of (category, source person_id, target person_id)
+    queries, with up to QUERIES_PER_CATEGORY of each category.
+    """
+    rng = random.Random(SEED)
+    found = {category: [] for category in CATEGORIES}
+    for _ in range(MAX_CANDIDATES):
+        if all(len(found[c]) >= QUERIES_PER_CATEGORY for c in CATEGORIES):
+            break
+        source = rng.randrange(len(graph))
+        target = rng.randrange(len(graph))
+        path = csr.search(graph, source, target)
+        if path is None:
+            category = "unreachable"
+        elif len(path) <= SHORT:
+            category = "short"
+        elif len(path) >= LONG:
+            category = "long"
+        else:
+            continue
+        if len(found[category]) < QUERIES_PER_CATEGORY:
+            found[category].append(
+                (graph.person_ids[source], graph.person_ids[target])
+            )
+    return [
+        (category, source, target)
+        for category in CATEGORIES
+        for source, target in found[category]
+    ]
+
+
+def measure(data, engine, source, target):
+    """
+    Runs one query on one engine. Returns (path length, people expanded,
+    wall seconds, peak traced bytes); tracing memory slows Python down,
+    so time and memory come from two separate runs.
+    """
+    data.activate()
+    run = ENGINES[engine]
+
+    start = time.perf_counter()
+    length, expanded = run(data, source, target)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    run(data, source, target)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return length, expanded, seconds, peak
+
+
+def counting(search):
+    """
+    Wraps a dict-based degrees search so that it also reports
+    how many people it expanded.
+    """
+    def run(data, source, target):
+        expanded = 0
+        neighbors_for_person = degrees.neighbors_for_person
+
+        def counted(person_id):
+            nonlocal expanded
+            expanded += 1
+            return neighbors_for_person(person_id)
+
+        degrees.neighbors_for_person = counted
+        try:
+            path = search(source, target)
+        finally:
+            degrees.neighbors_for_person = neighbors_for_person
+        return (None if path is None else len(path)), expanded
+    return run
+
+
+def run_csr(data, source, target):
+    graph = data.graph
+    path = csr.search(graph, graph.person_index[source],
+                      graph.person_index[target])
+    return (None if path is None else len(path)), graph.expanded
+
+
+ENGINES = {
+    "queue": counting(
+        lambda source, target: degrees.shortest_path(
+            source, target, QueueFrontier
+        )
+    ),
+    "deque": counting(
+        lambda source, target: degrees.shortest_path(
+            source, target, DequeQueueFrontier
+        )
+    ),
+    "bidirectional": counting(degrees.bidirectional_shortest_path),
+    "csr": run_csr
+}
+
+
+if __name__ == "__main__":
+    main()
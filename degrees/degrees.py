@@ -1,7 +1,9 @@
 import csv
 import sys
 
-from util import Node, StackFrontier, QueueFrontier
+import snapshot
+from nameindex import NameIndex
+from util import Node, DequeQueueFrontier
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,11 +14,32 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Prefix and fuzzy lookup over the keys of `names`
+name_index = NameIndex([])
+
 
 def load_data(directory):
     """
-    Load data from CSV files into memory.
+    Load data into memory, from the snapshot next to the CSV files
+    if it is up to date and from the CSV files otherwise.
+    """
+    data = snapshot.load(directory, "data", read_data)
+    names.update(data["names"])
+    people.update(data["people"])
+    movies.update(data["movies"])
+
+    global name_index
+    name_index = NameIndex(names)
+
+
+def read_data(directory):
+    """
+    Load data from CSV files, returning the names, people and movies dicts.
     """
+    names = {}
+    people = {}
+    movies = {}
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -51,11 +74,17 @@ def load_data(directory):
             except KeyError:
                 pass
 
+    return {"names": names, "people": people, "movies": movies}
+
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    args = sys.argv[1:]
+    bidirectional = "--bidirectional" in args
+    if bidirectional:
+        args.remove("--bidirectional")
+    if len(args) > 1:
+        sys.exit("Usage: python degrees.py [--bidirectional] [directory]")
+    directory = args[0] if len(args) == 1 else "large"
 
     # Load data from files into memory
     print("Loading data...")
@@ -69,7 +98,10 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    if bidirectional:
+        path = bidirectional_shortest_path(source, target)
+    else:
+        path = shortest_path(source, target)
 
     if path is None:
         print("Not connected.")
@@ -84,7 +116,7 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, frontier_class=DequeQueueFrontier):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
@@ -96,8 +128,9 @@ def shortest_path(source, target):
     #initialize frontier
     start = Node(state=source, parent=None, action=None)
     end = Node(state=target, parent=None, action=None)
-    frontier = QueueFrontier()
+    frontier = frontier_class()
     frontier.add(start)
+    explored = set()
     
     #loop until solution is found
     while (True):
@@ -118,14 +151,15 @@ def shortest_path(source, target):
                 peopleList.reverse()
                 solutionList =[]
                 for i in range(len(actions)):
-                    tuple = (peopleList[i], actions[i])
+                    tuple = (actions[i], peopleList[i])
                     solutionList.append(tuple)
                 return solutionList
 
         #add neighboring nodes to the frontier
+        explored.add(node.state)
         newNeighbors = neighbors_for_person(node.state)
         for newPair in newNeighbors:
-                if not frontier.contains_state(newPair[1]):
+                if not frontier.contains_state(newPair[1]) and newPair[1] not in explored:
                     child = Node(state=newPair[1], parent=node, action=newPair[0])
                     frontier.add(child)
 
@@ -134,14 +168,103 @@ def shortest_path(source, target):
     raise NotImplementedError
 
 
+def bidirectional_shortest_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching breadth-first
+    from both ends at once and stopping where the two searches meet.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+
+    # Maps each discovered person to the (movie_id, person_id) it was reached by
+    forward = {source: None}
+    backward = {target: None}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+        # Always grow the smaller side by one full level
+        expand_forward = len(forward_frontier) <= len(backward_frontier)
+        if expand_forward:
+            frontier, parents, others = forward_frontier, forward, backward
+        else:
+            frontier, parents, others = backward_frontier, backward, forward
+
+        next_frontier = []
+        meeting = None
+        best_length = None
+        for person_id in frontier:
+            for movie_id, neighbor in neighbors_for_person(person_id):
+                if neighbor in parents:
+                    continue
+                parents[neighbor] = (movie_id, person_id)
+                next_frontier.append(neighbor)
+                if neighbor in others:
+                    # Finish the level so the shortest meeting point wins
+                    length = _depth(forward, neighbor) + _depth(backward, neighbor)
+                    if best_length is None or length < best_length:
+                        meeting = neighbor
+                        best_length = length
+
+        if meeting is not None:
+            return _join_paths(forward, backward, meeting)
+
+        if expand_forward:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+
+    return None
+
+
+def _depth(parents, person_id):
+    """
+    Returns how many hops `person_id` is from the root of `parents`.
+    """
+    depth = 0
+    while parents[person_id] is not None:
+        person_id = parents[person_id][1]
+        depth += 1
+    return depth
+
+
+def _join_paths(forward, backward, meeting):
+    """
+    Stitches the forward and backward search trees together at `meeting`
+    into a list of (movie_id, person_id) pairs from source to target.
+    """
+    path = []
+    person_id = meeting
+    while forward[person_id] is not None:
+        movie_id, parent = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = parent
+    path.reverse()
+
+    person_id = meeting
+    while backward[person_id] is not None:
+        movie_id, child = backward[person_id]
+        path.append((movie_id, child))
+        person_id = child
+    return path
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
-    resolving ambiguities as needed.
+    resolving ambiguities and misspellings as needed.
     """
     person_ids = list(names.get(name.lower(), set()))
     if len(person_ids) == 0:
-        return None
+        # Fall back to the closest spelling, if any is close enough
+        matches = name_index.fuzzy(name, limit=1)
+        if len(matches) == 0:
+            return None
+        print(f"Assuming '{name}' means '{matches[0]}'.")
+        return person_id_for_name(matches[0])
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
         for person_id in person_ids:
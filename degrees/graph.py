@@ -0,0 +1,474 @@
+import csv
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+import snapshot
+from nameindex import NameIndex
+
+# Header of a precomputed search tree file: magic, person count, data stamp
+TREE_HEADER = struct.Struct("<4sII")
+TREE_MAGIC = b"DEGT"
+
+
+class Graph():
+    """
+    Co-star graph with people and movies numbered densely from 0.
+
+    Person -> movie and movie -> person adjacency are stored in compressed
+    sparse row form: the movies of person `p` are
+    `person_movies[person_offsets[p]:person_offsets[p + 1]]`, and likewise
+    the stars of movie `m` are
+    `movie_people[movie_offsets[m]:movie_offsets[m + 1]]`.
+    """
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_people):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+
+        self.person_index = {
+            person_id: i for i, person_id in enumerate(person_ids)
+        }
+        self.movie_index = {
+            movie_id: i for i, movie_id in enumerate(movie_ids)
+        }
+
+        # Maps lower-cased names to a list of person indices
+        self.names = {}
+        for i, name in enumerate(person_names):
+            self.names.setdefault(name.lower(), []).append(i)
+        self.name_index = NameIndex(self.names)
+
+        # People expanded by the most recent search, for benchmarking
+        self.expanded = 0
+
+        # Maps source person indices to precomputed
+        # (parent_person, parent_movie, distance) arrays
+        self.trees = {}
+
+    def __getstate__(self):
+        # The lookup dicts are cheap to rebuild, so snapshots leave them out
+        return (self.person_ids, self.person_names, self.person_births,
+                self.movie_ids, self.movie_titles, self.movie_years,
+                self.person_offsets, self.person_movies,
+                self.movie_offsets, self.movie_people)
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def __len__(self):
+        return len(self.person_ids)
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for people
+        who starred with a given person.
+        """
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+        for i in range(person_offsets[person], person_offsets[person + 1]):
+            movie = person_movies[i]
+            for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                yield movie, movie_people[j]
+
+
+def load_graph(directory):
+    """
+    Load a `Graph`, from the snapshot next to the CSV files
+    if it is up to date and from the CSV files otherwise.
+    """
+    graph = snapshot.load(directory, "graph", read_graph)
+    load_trees(graph, directory)
+    return graph
+
+
+def read_graph(directory):
+    """
+    Load data from CSV files into a `Graph`, streaming stars.csv twice:
+    once to count each person's and movie's stars, then again to fill
+    the preallocated adjacency arrays in place.
+    """
+    person_ids = []
+    person_names = []
+    person_births = []
+    for person_id, name, birth in read_columns(
+            f"{directory}/people.csv", ["id", "name", "birth"]):
+        person_ids.append(person_id)
+        person_names.append(name)
+        person_births.append(sys.intern(birth))
+
+    movie_ids = []
+    movie_titles = []
+    movie_years = []
+    for movie_id, title, year in read_columns(
+            f"{directory}/movies.csv", ["id", "title", "year"]):
+        movie_ids.append(movie_id)
+        movie_titles.append(title)
+        movie_years.append(sys.intern(year))
+
+    person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+    movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+
+    # First pass: count stars per person and per movie
+    person_offsets = array("i", bytes(4 * (len(person_ids) + 1)))
+    movie_offsets = array("i", bytes(4 * (len(movie_ids) + 1)))
+    for person, movie in read_stars(directory, person_index, movie_index):
+        person_offsets[person + 1] += 1
+        movie_offsets[movie + 1] += 1
+    accumulate(person_offsets)
+    accumulate(movie_offsets)
+
+    # Second pass: fill each row's slice, using a cursor per row
+    # as its next free slot
+    person_movies = array("i", bytes(4 * person_offsets[-1]))
+    movie_people = array("i", bytes(4 * movie_offsets[-1]))
+    person_cursor = person_offsets[:-1]
+    movie_cursor = movie_offsets[:-1]
+    for person, movie in read_stars(directory, person_index, movie_index):
+        person_movies[person_cursor[person]] = movie
+        person_cursor[person] += 1
+        movie_people[movie_cursor[movie]] = person
+        movie_cursor[movie] += 1
+
+    # Graph builds its own lookup dicts, so drop these first
+    del person_index, movie_index, person_cursor, movie_cursor
+    return Graph(person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_people)
+
+
+def read_columns(path, columns):
+    """
+    Yields the given columns of each row of a CSV file as tuples,
+    one row at a time.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        positions = [header.index(column) for column in columns]
+        for row in reader:
+            yield tuple(row[i] for i in positions)
+
+
+def read_stars(directory, person_index, movie_index):
+    """
+    Yields (person, movie) index pairs from stars.csv,
+    skipping rows that refer to unknown people or movies.
+    """
+    for person_id, movie_id in read_columns(
+            f"{directory}/stars.csv", ["person_id", "movie_id"]):
+        person = person_index.get(person_id)
+        movie = movie_index.get(movie_id)
+        if person is not None and movie is not None:
+            yield person, movie
+
+
+def accumulate(offsets):
+    """
+    Turns per-row counts stored at offsets[i + 1] into row start offsets.
+    """
+    for i in range(len(offsets) - 1):
+        offsets[i + 1] += offsets[i]
+
+
+def peak_memory():
+    """
+    Returns the peak resident memory of this process in megabytes,
+    or None where the platform cannot report it.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    if sys.platform == "darwin":
+        return peak / 2 ** 20
+    return peak / 2 ** 10
+
+
+def shortest_path(graph, source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target person_id.
+
+    If no possible path, returns None.
+    """
+    path = search(graph, graph.person_index[source], graph.person_index[target])
+    if path is None:
+        return None
+    return [
+        (graph.movie_ids[movie], graph.person_ids[person])
+        for movie, person in path
+    ]
+
+
+def search(graph, source, target):
+    """
+    Breadth-first search over person indices. Returns the shortest list of
+    (movie, person) index pairs from source to target, or None.
+    """
+    graph.expanded = 0
+    if source == target:
+        return []
+
+    # Precomputed trees answer by lookup; the graph is undirected, so a
+    # tree rooted at the target serves just as well walked the other way
+    if source in graph.trees:
+        return path_from_tree(graph.trees[source], source, target)
+    if target in graph.trees:
+        parent_person, parent_movie, _ = graph.trees[target]
+        if parent_person[source] == -1:
+            return None
+        return trace_back(parent_person, parent_movie, source, target)
+
+    return path_from_tree(search_tree(graph, source, target), source, target)
+
+
+def search_tree(graph, source, target=-1):
+    """
+    Breadth-first search outward from the source person index, stopping
+    early once `target` is discovered. Returns (parent_person, parent_movie)
+    arrays, where parent_person[p] is -1 for every person not reached.
+    """
+    person_offsets = graph.person_offsets
+    person_movies = graph.person_movies
+    movie_offsets = graph.movie_offsets
+    movie_people = graph.movie_people
+
+    parent_person = array("i", [-1]) * len(graph)
+    parent_movie = array("i", [-1]) * len(graph)
+    parent_person[source] = source
+
+    # Movies only need expanding once, the first time any star reaches them
+    seen_movie = bytearray(len(graph.movie_ids))
+
+    queue = array("i", [source])
+    head = 0
+    while head < len(queue):
+        person = queue[head]
+        head += 1
+        for i in range(person_offsets[person], person_offsets[person + 1]):
+            movie = person_movies[i]
+            if seen_movie[movie]:
+                continue
+            seen_movie[movie] = 1
+            for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                neighbor = movie_people[j]
+                if parent_person[neighbor] != -1:
+                    continue
+                parent_person[neighbor] = person
+                parent_movie[neighbor] = movie
+                if neighbor == target:
+                    graph.expanded = head
+                    return parent_person, parent_movie
+                queue.append(neighbor)
+    graph.expanded = head
+    return parent_person, parent_movie
+
+
+def trace(parent_person, parent_movie, source, target):
+    """
+    Walks parent arrays back from target to source, returning the
+    (movie, person) index pairs in source-to-target order.
+    """
+    path = []
+    person = target
+    while person != source:
+        path.append((parent_movie[person], person))
+        person = parent_person[person]
+    path.reverse()
+    return path
+
+
+def path_from_tree(tree, source, target):
+    """
+    Returns the path from source to target in a search tree rooted at
+    source, as from `search_tree` or a precomputed tree, or None if the
+    tree does not reach target.
+    """
+    if source == target:
+        return []
+    if tree[0][target] == -1:
+        return None
+    return trace(tree[0], tree[1], source, target)
+
+
+def trace_back(parent_person, parent_movie, source, root):
+    """
+    Walks parent arrays of a tree rooted at `root` up from source,
+    returning the (movie, person) index pairs from source to root.
+    """
+    path = []
+    person = source
+    while person != root:
+        path.append((parent_movie[person], parent_person[person]))
+        person = parent_person[person]
+    return path
+
+
+def distance(graph, source, target):
+    """
+    Returns the number of degrees between two person indices,
+    or None if they are not connected.
+    """
+    for root, other in ((source, target), (target, source)):
+        if root in graph.trees:
+            d = graph.trees[root][2][other]
+            return None if d == -1 else d
+    path = search(graph, source, target)
+    return None if path is None else len(path)
+
+
+def precompute_tree(graph, source):
+    """
+    Runs one breadth-first search from source over the whole graph.
+    Returns (parent_person, parent_movie, distance) arrays, with -1
+    marking people who cannot be reached.
+    """
+    parent_person, parent_movie = search_tree(graph, source)
+    distances = array("h", [-1]) * len(graph)
+    distances[source] = 0
+    for person in range(len(graph)):
+        if parent_person[person] == -1:
+            continue
+
+        # Climb until a person with a known distance, then fill back down
+        chain = []
+        while distances[person] == -1:
+            chain.append(person)
+            person = parent_person[person]
+        d = distances[person]
+        for person in reversed(chain):
+            d += 1
+            distances[person] = d
+    return parent_person, parent_movie, distances
+
+
+def tree_path(directory, person_id):
+    return os.path.join(directory, f".{person_id}.tree")
+
+
+def tree_stamp(directory):
+    return zlib.crc32(repr(snapshot.fingerprint(directory)).encode())
+
+
+def save_tree(graph, directory, source, tree):
+    """
+    Writes a precomputed tree next to the CSV files as a header
+    followed by the raw parent and distance arrays.
+    """
+    path = tree_path(directory, graph.person_ids[source])
+    with open(path + ".tmp", "wb") as f:
+        f.write(TREE_HEADER.pack(TREE_MAGIC, len(graph), tree_stamp(directory)))
+        for values in tree:
+            values.tofile(f)
+    os.replace(path + ".tmp", path)
+
+
+def load_trees(graph, directory):
+    """
+    Loads every up to date precomputed tree in `directory` into graph.trees.
+    """
+    stamp = tree_stamp(directory)
+    for filename in os.listdir(directory):
+        if not (filename.startswith(".") and filename.endswith(".tree")):
+            continue
+        source = graph.person_index.get(filename[1:-len(".tree")])
+        if source is None:
+            continue
+        with open(os.path.join(directory, filename), "rb") as f:
+            header = f.read(TREE_HEADER.size)
+            if header != TREE_HEADER.pack(TREE_MAGIC, len(graph), stamp):
+                continue
+            tree = (array("i"), array("i"), array("h"))
+            try:
+                for values in tree:
+                    values.fromfile(f, len(graph))
+            except EOFError:
+                continue
+        graph.trees[source] = tree
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python graph.py [directory]")
+    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+
+    print("Loading data...")
+    fresh = snapshot.fresh(directory, "graph")
+    graph = load_graph(directory)
+    print("Data loaded.")
+    peak = peak_memory()
+    if peak is not None:
+        source = "the snapshot" if fresh else "the CSV files"
+        print(f"Peak memory loading from {source}: {peak:.0f} MB")
+
+    source = person_for_name(graph, input("Name: "))
+    if source is None:
+        sys.exit("Person not found.")
+    target = person_for_name(graph, input("Name: "))
+    if target is None:
+        sys.exit("Person not found.")
+
+    path = search(graph, source, target)
+
+    if path is None:
+        print("Not connected.")
+    else:
+        degrees = len(path)
+        print(f"{degrees} degrees of separation.")
+        path = [(None, source)] + path
+        for i in range(degrees):
+            person1 = graph.person_names[path[i][1]]
+            person2 = graph.person_names[path[i + 1][1]]
+            movie = graph.movie_titles[path[i + 1][0]]
+            print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+
+
+def person_for_name(graph, name):
+    """
+    Returns the person index for a name,
+    resolving ambiguities and misspellings as needed.
+    """
+    people = graph.names.get(name.lower(), [])
+    if len(people) == 0:
+        matches = graph.name_index.fuzzy(name, limit=1)
+        if len(matches) == 0:
+            return None
+        print(f"Assuming '{name}' means '{matches[0]}'.")
+        return person_for_name(graph, matches[0])
+    elif len(people) > 1:
+        print(f"Which '{name}'?")
+        for person in people:
+            person_id = graph.person_ids[person]
+            name = graph.person_names[person]
+            birth = graph.person_births[person]
+            print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
+        person_id = input("Intended Person ID: ")
+        person = graph.person_index.get(person_id)
+        if person in people:
+            return person
+        return None
+    else:
+        return people[0]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import difflib
+from array import array
+from bisect import bisect_left
+
+# Trigrams shared by more than this fraction of names are too common
+# to narrow down fuzzy matches, so they are skipped when counting
+# once at least MIN_TRIGRAMS rarer ones have been counted
+COMMON_TRIGRAM = 0.05
+MIN_TRIGRAMS = 3
+
+# How many names sharing the most trigrams are scored in full
+FUZZY_CANDIDATES = 50
+
+
+class NameIndex():
+    """
+    Index over lower-cased names for prefix completion and
+    typo-tolerant lookup.
+
+    Names are kept sorted so that every name with a given prefix is one
+    contiguous run found by bisection. Fuzzy lookup counts shared
+    trigrams through an inverted index, built on first use, and only
+    scores the best few candidates in full.
+    """
+    def __init__(self, names):
+        # Names arrive lower-cased and unique, e.g. the keys of a names dict,
+        # so the index shares those strings instead of copying them
+        self.names = sorted(names)
+        self.trigrams = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        name = name.lower()
+        i = bisect_left(self.names, name)
+        return i < len(self.names) and self.names[i] == name
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns up to `limit` names starting with `prefix`, in sorted order.
+        """
+        prefix = prefix.lower()
+        matches = []
+        i = bisect_left(self.names, prefix)
+        while (i < len(self.names) and len(matches) < limit
+               and self.names[i].startswith(prefix)):
+            matches.append(self.names[i])
+            i += 1
+        return matches
+
+    def fuzzy(self, name, limit=5, cutoff=0.75):
+        """
+        Returns up to `limit` names most similar to `name`, best first,
+        ignoring any whose similarity ratio is below `cutoff`.
+        """
+        name = name.lower()
+        if name in self:
+            return [name]
+        if self.trigrams is None:
+            self.build_trigrams()
+
+        # Count how many of the query's trigrams each name shares, rarest
+        # trigrams first, stopping at common ones once a few were counted
+        postings_lists = sorted(
+            (self.trigrams[trigram] for trigram in trigrams_for(name)
+             if trigram in self.trigrams),
+            key=len
+        )
+        common = COMMON_TRIGRAM * len(self.names)
+        counts = {}
+        for used, postings in enumerate(postings_lists):
+            if len(postings) > common and used >= MIN_TRIGRAMS:
+                break
+            for i in postings:
+                counts[i] = counts.get(i, 0) + 1
+        candidates = sorted(counts, key=counts.get, reverse=True)
+        candidates = candidates[:FUZZY_CANDIDATES]
+
+        matcher = difflib.SequenceMatcher(b=name)
+        scored = []
+        for i in candidates:
+            matcher.set_seq1(self.names[i])
+            if matcher.real_quick_ratio() < cutoff:
+                continue
+            if matcher.quick_ratio() < cutoff:
+                continue
+            score = matcher.ratio()
+            if score >= cutoff:
+                scored.append((score, self.names[i]))
+        scored.sort(key=lambda match: (-match[0], match[1]))
+        return [match for _, match in scored[:limit]]
+
+    def build_trigrams(self):
+        """
+        Builds the inverted index from each trigram to the positions
+        of the names containing it.
+        """
+        self.trigrams = {}
+        for i, name in enumerate(self.names):
+            for trigram in trigrams_for(name):
+                postings = self.trigrams.get(trigram)
+                if postings is None:
+                    postings = self.trigrams[trigram] = array("i")
+                postings.append(i)
+
+
+def trigrams_for(name):
+    """
+    Returns the set of trigrams in `name`, padded so that
+    the start and end of the name count as well.
+    """
+    padded = f"  {name} "
+    return set(padded[i:i + 3] for i in range(len(padded) - 2))
@@ -0,0 +1,27 @@
+import sys
+
+from graph import load_graph, person_for_name, precompute_tree, save_tree
+
+
+def main():
+    if len(sys.argv) < 3:
+        sys.exit("Usage: python precompute.py directory name [name ...]")
+    directory = sys.argv[1]
+
+    print("Loading data...")
+    graph = load_graph(directory)
+    print("Data loaded.")
+
+    for name in sys.argv[2:]:
+        source = person_for_name(graph, name)
+        if source is None:
+            print(f"{name}: person not found.")
+            continue
+        tree = precompute_tree(graph, source)
+        save_tree(graph, directory, source, tree)
+        reached = sum(1 for d in tree[2] if d != -1)
+        print(f"{name}: saved distances to {reached} people.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import asyncio
+import json
+import sys
+import time
+from collections import OrderedDict
+
+import batch
+from graph import path_from_tree, search, search_tree
+
+# How many recent results and search trees to keep
+RESULT_CACHE_SIZE = 4096
+TREE_CACHE_SIZE = 32
+
+
+class LRUCache():
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        if key not in self.entries:
+            return None
+        self.entries.move_to_end(key)
+        return self.entries[key]
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class QueryServer():
+    """
+    Answers shortest path queries against a graph held in memory.
+
+    Clients send one JSON object per line, either
+    {"source": name, "target": name} or {"stats": true}, and receive one
+    JSON object per line in reply.
+    """
+    def __init__(self, directory):
+        batch.init_worker(directory)
+        self.results = LRUCache(RESULT_CACHE_SIZE)
+        self.trees = LRUCache(TREE_CACHE_SIZE)
+
+        # Sources queried recently; a repeat source gets a full search tree
+        self.sources = LRUCache(RESULT_CACHE_SIZE)
+
+        self.queries = 0
+        self.hits = 0
+        self.total_latency = 0
+
+    def answer(self, source_name, target_name):
+        """
+        Returns the result dict for one query, with its latency
+        and whether it was served from the cache.
+        """
+        start = time.perf_counter()
+        result, cached = self.lookup(source_name, target_name)
+        latency = (time.perf_counter() - start) * 1000
+
+        self.queries += 1
+        self.hits += cached
+        self.total_latency += latency
+        return dict(result, latency_ms=round(latency, 3), cached=cached)
+
+    def lookup(self, source_name, target_name):
+        source, error = batch.resolve(source_name)
+        if source is None:
+            return batch.failure(source_name, target_name, error), False
+        target, error = batch.resolve(target_name)
+        if target is None:
+            return batch.failure(source_name, target_name, error), False
+
+        # Paths are cached rather than replies, which echo the names as
+        # they were typed in each query
+        if (source, target) in self.results:
+            path = self.results.get((source, target))
+            return batch.success(source_name, target_name, path), True
+
+        tree = batch.graph.trees.get(source) or self.trees.get(source)
+        if tree is None and source in self.sources:
+            tree = search_tree(batch.graph, source)
+            self.trees.put(source, tree)
+        self.sources.put(source, True)
+
+        if tree is None:
+            path = search(batch.graph, source, target)
+        else:
+            path = path_from_tree(tree, source, target)
+
+        self.results.put((source, target), path)
+        return batch.success(source_name, target_name, path), False
+
+    def stats(self):
+        return {
+            "queries": self.queries,
+            "cache_hits": self.hits,
+            "mean_latency_ms": (
+                round(self.total_latency / self.queries, 3)
+                if self.queries else None
+            ),
+            "cached_results": len(self.results),
+            "cached_trees": len(self.trees)
+        }
+
+    async def handle(self, reader, writer):
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                request = json.loads(line)
+                if request.get("stats"):
+                    response = self.stats()
+                else:
+                    response = self.answer(request["source"],
+                                           request["target"])
+                    print(f"{response['source']} -> {response['target']}: "
+                          f"{response['latency_ms']} ms", file=sys.stderr)
+            except (ValueError, KeyError, TypeError, AttributeError):
+                response = {"error": "Invalid request."}
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+        writer.close()
+
+
+async def serve(directory, port=None, path=None):
+    print("Loading data...")
+    server = QueryServer(directory)
+    print("Data loaded.")
+    if path is not None:
+        listener = await asyncio.start_unix_server(server.handle, path=path)
+        print(f"Listening on {path}")
+    else:
+        listener = await asyncio.start_server(server.handle,
+                                              "127.0.0.1", port)
+        print(f"Listening on 127.0.0.1:{port}")
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    args = sys.argv[1:]
+    port = 8765
+    path = None
+    if "--port" in args:
+        i = args.index("--port")
+        try:
+            port = int(args[i + 1])
+        except (IndexError, ValueError):
+            sys.exit("--port needs a number")
+        del args[i:i + 2]
+    if "--socket" in args:
+        i = args.index("--socket")
+        if i + 1 >= len(args):
+            sys.exit("--socket needs a path")
+        path = args[i + 1]
+        del args[i:i + 2]
+    if len(args) > 1:
+        sys.exit("Usage: python server.py [--port N | --socket path] [directory]")
+    directory = args[0] if len(args) == 1 else "large"
+
+    try:
+        asyncio.run(serve(directory, port, path))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import gc
+import os
+import pickle
+import sys
+
+# CSV files whose size and modification time invalidate a snapshot
+SOURCES = ["people.csv", "movies.csv", "stars.csv"]
+
+# Bumped whenever the pickled data changes shape, to invalidate snapshots
+FORMAT = 2
+
+
+def fingerprint(directory):
+    """
+    Returns a tuple identifying the current version of the CSV files
+    and of the snapshot format.
+    """
+    stamp = [FORMAT]
+    for filename in SOURCES:
+        stat = os.stat(os.path.join(directory, filename))
+        stamp.append((filename, stat.st_size, stat.st_mtime_ns))
+    return tuple(stamp)
+
+
+def snapshot_path(directory, name):
+    return os.path.join(directory, f".{name}.snapshot")
+
+
+def load(directory, name, build):
+    """
+    Returns the snapshot called `name` stored next to the CSV files in
+    `directory`. If it is missing or older than the CSV files, calls
+    `build(directory)` and saves the result as a fresh snapshot.
+    """
+    path = snapshot_path(directory, name)
+    try:
+        with open(path, "rb") as f:
+            # The stamp is pickled on its own ahead of the data, so a stale
+            # snapshot is detected without unpickling the data
+            if pickle.load(f) == fingerprint(directory):
+                # Unpickling millions of small objects is much faster
+                # without the cyclic garbage collector running
+                enabled = gc.isenabled()
+                gc.disable()
+                try:
+                    return pickle.load(f)
+                finally:
+                    if enabled:
+                        gc.enable()
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError,
+            TypeError, AttributeError):
+        pass
+    return rebuild(directory, name, build)
+
+
+def fresh(directory, name):
+    """
+    Returns True if the snapshot called `name` is up to date with the
+    CSV files, reading only its stamp.
+    """
+    try:
+        with open(snapshot_path(directory, name), "rb") as f:
+            return pickle.load(f) == fingerprint(directory)
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError,
+            TypeError, AttributeError):
+        return False
+
+
+def rebuild(directory, name, build, strict=False):
+    """
+    Builds the snapshot called `name` from the CSV files and saves it.
+    If the directory cannot be written to, the data is still returned,
+    unless `strict` is set, in which case the OSError is raised.
+    """
+    stamp = fingerprint(directory)
+    data = build(directory)
+    path = snapshot_path(directory, name)
+    # Write to a temporary file first so readers never see a partial snapshot
+    try:
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump(stamp, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+    except OSError:
+        if strict:
+            raise
+    return data
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python snapshot.py [directory]")
+    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+
+    import degrees
+    import graph
+
+    print("Rebuilding snapshots...")
+    try:
+        # The graph goes first, so the peak so far is that of reading the
+        # CSV files into it, before the larger dicts are built
+        rebuild(directory, "graph", graph.read_graph, strict=True)
+        peak = graph.peak_memory()
+        if peak is not None:
+            print(f"Peak memory reading the CSV files into the graph: "
+                  f"{peak:.0f} MB")
+        rebuild(directory, "data", degrees.read_data, strict=True)
+    except OSError as e:
+        sys.exit(f"Could not save snapshot: {e}")
+    print("Snapshots rebuilt.")
+
+
+if __name__ == "__main__":
+    main()
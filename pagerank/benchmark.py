@@ -0,0 +1,426 @@
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse import linalg
+
+from crawler import crawl_cached, crawl_concurrent, read_edges, CACHE
+from matrix import iterate_pagerank_sparse, solve_pagerank
+from outofcore import EDGE, memmap_pagerank
+from pagerank import DAMPING, crawl, iterate_pagerank, sample_pagerank
+from walkers import sample_pagerank_parallel
+
+# Seed for the generated graphs, fixed so runs are comparable
+SEED = 50
+
+# Power-law exponents of the out-degree and in-degree distributions,
+# roughly those measured on the web
+OUT_EXPONENT = 2.1
+IN_EXPONENT = 2.1
+
+# Most links on any one page, and the share of pages with no links
+MAX_LINKS = 1000
+DANGLING = 0.1
+
+# Pages generated at a time, so large graphs are written in pieces
+PAGE_BLOCK = 1 << 16
+
+# Random surfer steps per page taken by the sampling engines
+SAMPLES_PER_PAGE = 100
+
+# Graphs up to this many pages get reference ranks from a sparse LU
+# solve; larger ones from out-of-core power iteration to within an L1
+# change of REFERENCE_TOLERANCE, which the memmap engine cannot be checked
+# against
+LINEAR_REFERENCE = 10 ** 5
+REFERENCE_TOLERANCE = 1e-10
+
+# Files making up each generated graph
+EDGES = "edges.bin"
+NAMES = "names.txt"
+EDGE_LIST = "edges.tsv"
+
+FORMATS = ["html", "edges"]
+
+
+def main():
+    args = sys.argv[1:]
+    sizes = [10 ** 3, 10 ** 4, 10 ** 5]
+    if "--sizes" in args:
+        i = args.index("--sizes")
+        if i + 1 >= len(args):
+            sys.exit("--sizes needs a comma-separated list")
+        sizes = [int(float(size)) for size in args[i + 1].split(",")]
+        del args[i:i + 2]
+    graph_format = "html"
+    if "--format" in args:
+        i = args.index("--format")
+        if i + 1 >= len(args) or args[i + 1] not in FORMATS:
+            sys.exit(f"--format needs one of {', '.join(FORMATS)}")
+        graph_format = args[i + 1]
+        del args[i:i + 2]
+    engines = list(CRAWLERS) + list(RANKERS)
+    if "--engines" in args:
+        i = args.index("--engines")
+        if i + 1 >= len(args):
+            sys.exit("--engines needs a comma-separated list")
+        engines = args[i + 1].split(",")
+        del args[i:i + 2]
+        for engine in engines:
+            if engine not in CRAWLERS and engine not in RANKERS:
+                sys.exit(f"Unknown engine '{engine}', choose from "
+                         f"{', '.join(list(CRAWLERS) + list(RANKERS))}")
+    if len(args) > 1:
+        sys.exit("Usage: python benchmark.py [--sizes n,n,...] "
+                 "[--format html|edges] [--engines name,...] [directory]")
+    directory = args[0] if args else "synthetic"
+
+    mismatches = 0
+    for n in sizes:
+        path = os.path.join(directory, f"{graph_format}-{n}")
+        start = time.perf_counter()
+        pages, links = generate(path, n, html=graph_format == "html")
+        print(f"{pages} pages, {links} links in {path} "
+              f"({time.perf_counter() - start:.2f} s to generate or check)")
+        data = Dataset(path, html=graph_format == "html")
+        print(f"Errors against a reference from {data.reference_method}")
+        print(f"{'engine':<14} {'seconds':>9} {'throughput':>20} "
+              f"{'peak MB':>9} {'error':>10}")
+        runnable = []
+        for engine in engines:
+            if engine in CRAWLERS and (engine == "read-edges") == data.html:
+                continue
+            limit = (CRAWLERS.get(engine) or RANKERS[engine])[1]
+            if limit is not None and n > limit:
+                print(f"{engine:<14} skipped above {limit} pages")
+                continue
+            runnable.append(engine)
+
+        for i, engine in enumerate(runnable):
+            if engine in CRAWLERS:
+                run, _, unit = CRAWLERS[engine]
+                uses_corpus = False
+            else:
+                run, _, unit, uses_corpus = RANKERS[engine]
+                # Built outside the measurements, as it is shared
+                data.reference
+            if uses_corpus:
+                data.corpus
+            result, work, seconds, peak = measure(run, data)
+            if engine in CRAWLERS:
+                error = data.crawl_error(result)
+                if error:
+                    mismatches += 1
+                    print(f"MISMATCH: {engine} found different links "
+                          f"on {error} pages")
+                error = f"{error:>10}"
+            elif engine == "memmap" and len(data) > LINEAR_REFERENCE:
+                error = f"{'self':>10}"
+            else:
+                error = f"{data.rank_error(result):>10.2e}"
+
+            # Free the corpus once no engine left to run reads it
+            if not any(later in CRAWLERS or RANKERS[later][3]
+                       for later in runnable[i + 1:]):
+                data.release()
+            rate = f"{work / seconds:.3g} {unit}/s"
+            print(f"{engine:<14} {seconds:>9.3f} {rate:>20} "
+                  f"{peak / 2 ** 20:>9.1f} {error}")
+        print()
+
+    if mismatches:
+        sys.exit(f"{mismatches} crawls did not match the generated links.")
+
+
+def generate_links(n, seed=SEED):
+    """
+    Yields the links of a random power-law graph of `n` pages, as
+    (sources, targets) arrays of page numbers for one block of pages at a
+    time, sorted by source and without repeated or self links.
+
+    Out-degrees follow a Zipf distribution with exponent OUT_EXPONENT,
+    with a DANGLING share of pages given no links at all. Targets are
+    drawn by a popularity rank whose Zipf weights give in-degrees a power
+    law with exponent IN_EXPONENT.
+    """
+    rng = np.random.default_rng(seed)
+    popularity = rng.permutation(n)
+    # Rank r is drawn with weight about (r + 1) ** -skew, by inverting the
+    # continuous power law on [1, n + 1]
+    skew = 1 / (IN_EXPONENT - 1)
+    top = (n + 1) ** (1 - skew) - 1
+    for start in range(0, n, PAGE_BLOCK):
+        stop = min(start + PAGE_BLOCK, n)
+        counts = np.minimum(rng.zipf(OUT_EXPONENT, stop - start),
+                            min(MAX_LINKS, n - 1))
+        counts[rng.random(stop - start) < DANGLING] = 0
+        sources = np.repeat(np.arange(start, stop, dtype=np.int64), counts)
+        ranks = (top * rng.random(len(sources)) + 1) ** (1 / (1 - skew)) - 1
+        targets = popularity[np.minimum(ranks.astype(np.int64), n - 1)]
+        keys = np.unique(sources * n + targets)
+        sources, targets = keys // n, keys % n
+        keep = sources != targets
+        yield start, stop, sources[keep], targets[keep]
+
+
+def generate(directory, n, html=False, seed=SEED):
+    """
+    Writes a random power-law graph of `n` pages to `directory`, unless
+    one is already there, and returns (number of pages, number of links).
+
+    Page i is named "i.html". The graph is always written as a binary
+    edge list with a names file, as `outofcore.convert_edges` would, and
+    either as one HTML file per page or as an edge list like the one
+    `crawler.crawl_to_edges` writes.
+    """
+    edge_path = os.path.join(directory, EDGES)
+    names_path = os.path.join(directory, NAMES)
+    if os.path.exists(names_path):
+        links = os.path.getsize(edge_path) // (2 * EDGE.itemsize)
+        return n, links
+
+    os.makedirs(directory, exist_ok=True)
+    links = 0
+    with open(edge_path, "wb") as out:
+        edge_list = None if html else open(
+            os.path.join(directory, EDGE_LIST), "w", encoding="utf-8"
+        )
+        for start, stop, sources, targets in generate_links(n, seed):
+            np.stack([sources, targets], axis=1).astype(EDGE).tofile(out)
+            links += len(sources)
+            boundaries = np.searchsorted(sources, np.arange(start, stop + 1))
+            for page in range(start, stop):
+                page_links = targets[boundaries[page - start]:
+                                     boundaries[page - start + 1]]
+                if html:
+                    write_page(directory, page, page_links)
+                elif len(page_links) == 0:
+                    edge_list.write(f"{page}.html\n")
+                else:
+                    edge_list.writelines(
+                        f"{page}.html\t{link}.html\n" for link in page_links
+                    )
+        if edge_list is not None:
+            edge_list.close()
+
+    # Written last, so an interrupted run is generated again
+    with open(names_path, "w", encoding="utf-8") as f:
+        f.writelines(f"{page}.html\n" for page in range(n))
+    return n, links
+
+
+def write_page(directory, page, links):
+    items = "".join(
+        f"            <li><a href=\"{link}.html\">{link}</a></li>\n"
+        for link in links
+    )
+    with open(os.path.join(directory, f"{page}.html"), "w") as f:
+        f.write("<!DOCTYPE html>\n<html lang=\"en\">\n    <head>\n"
+                f"        <title>{page}</title>\n    </head>\n    <body>\n"
+                f"        <h1>{page}</h1>\n\n        <div>Links:</div>\n"
+                f"        <ul>\n{items}        </ul>\n    </body>\n</html>\n")
+
+
+class Dataset():
+    """
+    One generated graph. Its page names, corpus dictionary and reference
+    ranks are built from the binary edge list when first needed, so that
+    engines which only read the edge list run without them in memory.
+    """
+    def __init__(self, directory, html):
+        self.directory = directory
+        self.html = html
+        self.edge_path = os.path.join(directory, EDGES)
+        with open(os.path.join(directory, NAMES), encoding="utf-8") as f:
+            self.pages = sum(1 for _ in f)
+        self.links = os.path.getsize(self.edge_path) // (2 * EDGE.itemsize)
+        self.reference_method = (
+            "a sparse LU solve" if self.pages <= LINEAR_REFERENCE
+            else "the memmap engine"
+        )
+        self._names = None
+        self._corpus = None
+        self._reference = None
+
+    def __len__(self):
+        return self.pages
+
+    @property
+    def names(self):
+        if self._names is None:
+            with open(os.path.join(self.directory, NAMES),
+                      encoding="utf-8") as f:
+                self._names = [line.rstrip("\n") for line in f]
+        return self._names
+
+    @property
+    def corpus(self):
+        if self._corpus is None:
+            self._corpus = {name: set() for name in self.names}
+            for source, target in self.edges().tolist():
+                self._corpus[self.names[source]].add(self.names[target])
+        return self._corpus
+
+    def release(self):
+        """
+        Drops the page names and corpus until they are next needed.
+        """
+        self._names = None
+        self._corpus = None
+
+    def edges(self):
+        if self.links == 0:
+            # An empty file cannot be memory-mapped
+            return np.empty((0, 2), dtype=EDGE)
+        return np.memmap(self.edge_path, dtype=EDGE, mode="r").reshape(-1, 2)
+
+    @property
+    def reference(self):
+        if self._reference is None:
+            if len(self) <= LINEAR_REFERENCE:
+                self._reference = self.linear_reference()
+            else:
+                self._reference = memmap_pagerank(
+                    self.edge_path, DAMPING, len(self),
+                    tolerance=REFERENCE_TOLERANCE, max_iterations=100000
+                )
+        return self._reference
+
+    def linear_reference(self):
+        """
+        Returns PageRank solved directly from the edge list, as the
+        solution of (I - DAMPING * links) x = 1 normalised to sum to 1,
+        without going through any of the engines being measured.
+        """
+        n = len(self)
+        edges = np.asarray(self.edges(), dtype=np.int64)
+        degrees = np.bincount(edges[:, 0], minlength=n)
+        links = sparse.csc_matrix(
+            (1 / degrees[edges[:, 0]], (edges[:, 1], edges[:, 0])),
+            shape=(n, n)
+        )
+        system = sparse.identity(n, format="csc") - DAMPING * links
+        solution = linalg.spsolve(system.tocsc(), np.ones(n))
+        return solution / solution.sum()
+
+    def crawl_error(self, corpus):
+        """
+        Returns how many pages `corpus` has different links for than the
+        generated graph, counting missing and extra pages.
+        """
+        return sum(
+            corpus.get(page) != self.corpus.get(page)
+            for page in self.corpus.keys() | corpus.keys()
+        )
+
+    def rank_error(self, ranks):
+        """
+        Returns the L1 distance from the reference ranks to `ranks`, given
+        either as a dictionary keyed by page name or an array in page order.
+        """
+        if isinstance(ranks, dict):
+            ranks = np.array([ranks.get(name, 0) for name in self.names])
+        return float(np.abs(ranks - self.reference).sum())
+
+
+def measure(run, data):
+    """
+    Runs one engine on one dataset. Returns (result, units of work done,
+    wall seconds, peak traced bytes); tracing memory slows Python down,
+    so time and memory come from two separate runs. Memory used by worker
+    processes is not traced.
+    """
+    start = time.perf_counter()
+    result, work = run(data)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    run(data)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, work, seconds, peak
+
+
+def run_cached_cold(data):
+    path = os.path.join(data.directory, CACHE)
+    if os.path.exists(path):
+        os.remove(path)
+    return crawl_cached(data.directory), data.links
+
+
+def run_cached_warm(data):
+    if not os.path.exists(os.path.join(data.directory, CACHE)):
+        crawl_cached(data.directory)
+    return crawl_cached(data.directory), data.links
+
+
+def run_iterate(data):
+    sweeps = []
+    ranks = iterate_pagerank(data.corpus, DAMPING, callback=sweeps.append)
+    return ranks, len(sweeps) * len(data) * data.links
+
+
+def samples(data):
+    return SAMPLES_PER_PAGE * len(data)
+
+
+def solver(name):
+    """
+    Returns an engine running `solve_pagerank` with the named solver,
+    whose work is one pass over the links per iteration.
+    """
+    def run(data):
+        ranks, telemetry = solve_pagerank(data.corpus, DAMPING, name)
+        return ranks, data.links * len(telemetry)
+    return run
+
+
+# Each crawler maps to (function of a Dataset returning its result and the
+# work it did, most pages it is run on or None, unit of work)
+CRAWLERS = {
+    "crawl": (lambda data: (crawl(data.directory), data.links),
+              10 ** 5, "links"),
+    "concurrent": (lambda data: (crawl_concurrent(data.directory),
+                                 data.links),
+                   10 ** 6, "links"),
+    "cached-cold": (run_cached_cold, 10 ** 6, "links"),
+    "cached-warm": (run_cached_warm, 10 ** 6, "links"),
+    "read-edges": (lambda data: (read_edges(os.path.join(
+                                     data.directory, EDGE_LIST)),
+                                 data.links),
+                   10 ** 6, "links")
+}
+
+# Each ranker maps to the same, and whether it reads the corpus dictionary
+RANKERS = {
+    # Pure Python, and each sweep scans every link for every page
+    "iterate": (run_iterate, 10 ** 3, "link visits", True),
+    "sample": (lambda data: (sample_pagerank(data.corpus, DAMPING,
+                                             samples(data)),
+                             samples(data)),
+               10 ** 6, "samples", True),
+    "walkers": (lambda data: (sample_pagerank_parallel(
+                                  data.corpus, DAMPING, samples(data),
+                                  seed=SEED)[0],
+                              samples(data)),
+                10 ** 6, "samples", True),
+    "sparse": (lambda data: (iterate_pagerank_sparse(data.corpus, DAMPING),
+                             data.links),
+               10 ** 6, "links", True),
+    "power": (solver("power"), 10 ** 6, "link visits", True),
+    "aitken": (solver("aitken"), 10 ** 6, "link visits", True),
+    "gauss-seidel": (solver("gauss-seidel"), 10 ** 6, "link visits",
+                     True),
+    "linear": (solver("linear"), 10 ** 5, "link visits", True),
+    "memmap": (lambda data: (memmap_pagerank(data.edge_path, DAMPING,
+                                             len(data)),
+                             data.links),
+               None, "links", False)
+}
+
+
+if __name__ == "__main__":
+    main()
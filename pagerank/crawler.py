@@ -0,0 +1,191 @@
+import hashlib
+import mmap
+import os
+import pickle
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+LINK = re.compile(rb"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
+
+# Files handed to each worker process at a time
+CHUNKSIZE = 64
+
+# Crawl results cached inside each corpus directory
+CACHE = ".crawl-cache.pickle"
+
+
+def main():
+    if len(sys.argv) not in (3, 4):
+        sys.exit("Usage: python crawler.py corpus edges.tsv [workers]")
+    workers = int(sys.argv[3]) if len(sys.argv) == 4 else None
+    pages, edges = crawl_to_edges(sys.argv[1], sys.argv[2], workers)
+    print(f"Wrote {edges} links between {pages} pages to {sys.argv[2]}")
+
+
+def html_files(directory):
+    """
+    Returns the names of the HTML files in `directory`.
+    """
+    return [
+        entry.name for entry in os.scandir(directory)
+        if entry.name.endswith(".html") and entry.is_file()
+    ]
+
+
+def extract_links(path):
+    """
+    Returns the set of link targets in one HTML file, scanning it through
+    a memory map so the file is never read into memory as a whole.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return set()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as contents:
+            return set(
+                match.group(1).decode("utf-8", "replace")
+                for match in LINK.finditer(contents)
+            )
+
+
+def parse(task):
+    directory, filename = task
+    return filename, extract_links(os.path.join(directory, filename))
+
+
+def parsed_pages(directory, filenames, workers=None):
+    """
+    Yields (filename, links) for each file as worker processes finish them.
+    """
+    tasks = [(directory, filename) for filename in filenames]
+    if workers == 1:
+        yield from map(parse, tasks)
+        return
+    with ProcessPoolExecutor(workers) as pool:
+        yield from pool.map(parse, tasks, chunksize=CHUNKSIZE)
+
+
+def crawl_concurrent(directory, workers=None):
+    """
+    Parse a directory of HTML pages in parallel and check for links to
+    other pages. Return the same dictionary as `crawl`.
+    """
+    filenames = html_files(directory)
+    corpus = set(filenames)
+    pages = dict()
+    for filename, links in parsed_pages(directory, filenames, workers):
+        pages[filename] = set(
+            link for link in links
+            if link in corpus and link != filename
+        )
+    return pages
+
+
+def crawl_to_edges(directory, path, workers=None):
+    """
+    Parse a directory of HTML pages in parallel, writing the link graph to
+    `path` as it goes so that only the list of file names stays in memory.
+
+    Each line of the edge list is "page<TAB>link"; a page with no links to
+    other pages in the corpus gets a line with just its name.
+    Returns (number of pages, number of links).
+    """
+    filenames = html_files(directory)
+    corpus = set(filenames)
+    edges = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for filename, links in parsed_pages(directory, filenames, workers):
+            links = [
+                link for link in links
+                if link in corpus and link != filename
+            ]
+            if not links:
+                f.write(f"{filename}\n")
+            for link in links:
+                f.write(f"{filename}\t{link}\n")
+            edges += len(links)
+    return len(filenames), edges
+
+
+def read_edges(path):
+    """
+    Load an edge list written by `crawl_to_edges` back into the same
+    dictionary as `crawl`.
+    """
+    pages = dict()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            page, _, link = line.rstrip("\n").partition("\t")
+            links = pages.setdefault(page, set())
+            if link:
+                links.add(link)
+    return pages
+
+
+def crawl_cached(directory, workers=None):
+    """
+    Return the same dictionary as `crawl`, re-parsing only the files that
+    were added or changed since the last call for this directory.
+
+    Each file's size, modification time, content hash and raw links are
+    cached in the directory when it can be written to. A file whose size
+    or modification time changed is hashed, and only re-parsed if its
+    contents differ.
+    """
+    path = os.path.join(directory, CACHE)
+    try:
+        with open(path, "rb") as f:
+            cache = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        cache = dict()
+
+    files = dict()
+    changed = []
+    for filename in html_files(directory):
+        stat = os.stat(os.path.join(directory, filename))
+        entry = cache.get(filename)
+        if entry is not None and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+            files[filename] = entry
+            continue
+        digest = file_hash(os.path.join(directory, filename))
+        if entry is not None and entry[2] == digest:
+            files[filename] = (stat.st_mtime_ns, stat.st_size, digest, entry[3])
+        else:
+            changed.append(filename)
+            files[filename] = (stat.st_mtime_ns, stat.st_size, digest, None)
+
+    # A pool only pays for itself once there are enough files to share
+    if len(changed) < CHUNKSIZE:
+        workers = 1
+    for filename, links in parsed_pages(directory, changed, workers):
+        files[filename] = files[filename][:3] + (links,)
+
+    if files != cache:
+        # The cache only saves work, so a read-only corpus is still crawled
+        try:
+            with open(path + ".tmp", "wb") as f:
+                pickle.dump(files, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(path + ".tmp", path)
+        except OSError:
+            pass
+
+    # Only include links to other pages in the corpus
+    pages = dict()
+    for filename, entry in files.items():
+        pages[filename] = set(
+            link for link in entry[3]
+            if link in files and link != filename
+        )
+    return pages
+
+
+def file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+from collections import deque
+
+from matrix import TOLERANCE, iterate_pagerank_sparse
+from pagerank import DAMPING
+
+# Pushing costs one step per page pushed and per link it pushes along.
+# Once pushes have cost this many times the size of the corpus the update
+# is not local, and vectorised power iteration from the old ranks is faster
+PUSH_BUDGET = 1
+
+
+def apply_edits(corpus, insertions=(), deletions=()):
+    """
+    Return a copy of `corpus` with the (page, link) pairs in `insertions`
+    added and those in `deletions` removed. Pages named by an insertion
+    that are not yet in the corpus are added with no links of their own.
+    """
+    corpus = {page: set(links) for page, links in corpus.items()}
+    for page, link in deletions:
+        if page in corpus:
+            corpus[page].discard(link)
+    for page, link in insertions:
+        corpus.setdefault(page, set())
+        corpus.setdefault(link, set())
+        if link != page:
+            corpus[page].add(link)
+    return corpus
+
+
+def update_pagerank(corpus, ranks, insertions=(), deletions=(),
+                    damping_factor=DAMPING, tolerance=TOLERANCE):
+    """
+    Update PageRank values after editing the links of `corpus`, starting
+    from the converged `ranks` of the unedited corpus instead of from
+    uniform values.
+
+    Return a pair of the edited corpus and a dictionary of its PageRank
+    values, as `apply_edits` and `iterate_pagerank` would return.
+
+    When the set of pages is unchanged, only pages whose links were edited
+    disturb the old solution, so their effect is propagated by local
+    pushes. Otherwise, or if the pushes spread too far, power iteration
+    takes over from the old ranks.
+    """
+    edited = apply_edits(corpus, insertions, deletions)
+    if edited.keys() != corpus.keys():
+        return edited, iterate_pagerank_sparse(
+            edited, damping_factor, tolerance, start=ranks
+        )
+
+    ranks = dict(ranks)
+    residuals = dict()
+    n = len(edited)
+
+    def spread(page, links, amount):
+        # Shares `amount` of rank leaving `page` among its links. A page
+        # with no links shares it equally with every page; a residual that
+        # is equal everywhere only rescales the solution, which the final
+        # normalisation absorbs, so it is dropped to keep pushes local.
+        if links:
+            share = amount / len(links)
+            for link in links:
+                residuals[link] = residuals.get(link, 0) + share
+
+    # With the old ranks converged, the residual of the edited corpus is
+    # the change in what each edited page passes along
+    for page in set(page for page, _ in insertions) | set(
+            page for page, _ in deletions):
+        if corpus[page] == edited[page]:
+            continue
+        spread(page, corpus[page], -damping_factor * ranks[page])
+        spread(page, edited[page], damping_factor * ranks[page])
+
+    # Push residuals until none is large enough to matter; the L1 error
+    # is then below `tolerance` / (1 - damping_factor)
+    threshold = tolerance / n
+    queue = deque(page for page in residuals
+                  if abs(residuals[page]) > threshold)
+    queued = set(queue)
+    budget = PUSH_BUDGET * (n + sum(len(links) for links in edited.values()))
+    while queue:
+        if budget < 0:
+            return edited, iterate_pagerank_sparse(
+                edited, damping_factor, tolerance, start=ranks
+            )
+        page = queue.popleft()
+        queued.discard(page)
+        budget -= 1 + len(edited[page])
+        amount = residuals.pop(page, 0)
+        ranks[page] += amount
+        spread(page, edited[page], damping_factor * amount)
+
+        for other in edited[page]:
+            if other not in queued and abs(residuals.get(other, 0)) > threshold:
+                queue.append(other)
+                queued.add(other)
+
+    total = sum(ranks.values())
+    return edited, {page: rank / total for page, rank in ranks.items()}
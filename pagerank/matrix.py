@@ -0,0 +1,206 @@
+import time
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse import linalg
+
+# Default L1 distance between successive rank vectors at which to stop
+TOLERANCE = 1e-6
+MAX_ITERATIONS = 1000
+
+# Power iterations between Aitken extrapolations
+AITKEN_PERIOD = 10
+
+
+class TransitionMatrix():
+    """
+    Sparse column-stochastic link matrix built once from a corpus.
+
+    `links[j, i]` is 1 / (number of links on page i) when page i links to
+    page j. Pages with no links are flagged in `dangling`; the random
+    surfer leaves them for any page with equal probability.
+    """
+    def __init__(self, corpus):
+        self.pages = sorted(corpus)
+        self.index = {page: i for i, page in enumerate(self.pages)}
+        n = len(self.pages)
+
+        rows = []
+        columns = []
+        weights = []
+        for page, links in corpus.items():
+            i = self.index[page]
+            for link in links:
+                rows.append(self.index[link])
+                columns.append(i)
+                weights.append(1 / len(links))
+
+        self.links = sparse.csr_matrix(
+            (weights, (rows, columns)), shape=(n, n), dtype=np.float64
+        )
+        self.dangling = np.array(
+            [len(corpus[page]) == 0 for page in self.pages], dtype=bool
+        )
+
+    def __len__(self):
+        return len(self.pages)
+
+    def step(self, ranks, damping_factor):
+        """
+        Returns the rank vector after one more step of the random surfer.
+        """
+        n = len(self)
+        spread = ranks[self.dangling].sum() / n
+        return (1 - damping_factor) / n + damping_factor * (
+            self.links @ ranks + spread
+        )
+
+    def to_dict(self, ranks):
+        return {page: float(ranks[i]) for i, page in enumerate(self.pages)}
+
+
+def iterate_pagerank_sparse(corpus, damping_factor,
+                            tolerance=TOLERANCE,
+                            max_iterations=MAX_ITERATIONS,
+                            start=None):
+    """
+    Return PageRank values for each page by power iteration over a sparse
+    transition matrix, until the L1 change between sweeps falls below
+    `tolerance`. Iteration starts from uniform ranks, or from the `start`
+    dictionary of ranks when one is given.
+
+    Return a dictionary where keys are page names, and values are
+    their estimated PageRank value (a value between 0 and 1). All
+    PageRank values should sum to 1.
+    """
+    matrix = TransitionMatrix(corpus)
+    if start is None:
+        ranks = np.full(len(matrix), 1 / len(matrix))
+    else:
+        ranks = np.array([start.get(page, 0) for page in matrix.pages],
+                         dtype=np.float64)
+        ranks /= ranks.sum()
+    for _ in range(max_iterations):
+        new_ranks = matrix.step(ranks, damping_factor)
+        change = np.abs(new_ranks - ranks).sum()
+        ranks = new_ranks
+        if change < tolerance:
+            break
+    return matrix.to_dict(ranks / ranks.sum())
+
+
+def solve_pagerank(corpus, damping_factor, solver="power",
+                   tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS,
+                   callback=None):
+    """
+    Return PageRank values for each page using the named solver from
+    SOLVERS, together with per-iteration telemetry.
+
+    Every solver produces a sequence of rank vectors, and stops once the
+    L1 change between successive ones falls below `tolerance`. The
+    telemetry is a list with one dictionary per iteration, holding the
+    `iteration` number, the `residual` (that L1 change) and the `seconds`
+    the iteration took; `callback`, if given, is called with each one as
+    it is recorded.
+    """
+    matrix = TransitionMatrix(corpus)
+    iterates = SOLVERS[solver](matrix, damping_factor)
+    ranks = np.full(len(matrix), 1 / len(matrix))
+    telemetry = []
+
+    start = time.perf_counter()
+    for iteration, new_ranks in enumerate(iterates, 1):
+        now = time.perf_counter()
+        record = {
+            "iteration": iteration,
+            "residual": float(np.abs(new_ranks - ranks).sum()),
+            "seconds": now - start
+        }
+        telemetry.append(record)
+        if callback is not None:
+            callback(record)
+        ranks = new_ranks
+        if record["residual"] < tolerance or iteration >= max_iterations:
+            break
+        start = time.perf_counter()
+    return matrix.to_dict(ranks), telemetry
+
+
+def power_iterates(matrix, damping_factor):
+    ranks = np.full(len(matrix), 1 / len(matrix))
+    while True:
+        ranks = matrix.step(ranks, damping_factor)
+        yield ranks
+
+
+def aitken_iterates(matrix, damping_factor):
+    """
+    Power iteration, applying Aitken's delta-squared extrapolation to each
+    page's rank every AITKEN_PERIOD steps to skip ahead along the slowly
+    decaying error. An extrapolation is only kept if a step from it
+    changes the ranks less than the last plain step did.
+    """
+    history = [np.full(len(matrix), 1 / len(matrix))]
+    step = 0
+    while True:
+        ranks = matrix.step(history[-1], damping_factor)
+        step += 1
+        history = history[-2:] + [ranks]
+        if step % AITKEN_PERIOD == 0 and len(history) == 3:
+            x0, x1, x2 = history
+            second = x2 - 2 * x1 + x0
+            safe = np.abs(second) > 1e-15
+            extrapolated = x2.copy()
+            extrapolated[safe] -= (x2 - x1)[safe] ** 2 / second[safe]
+            extrapolated = np.clip(extrapolated, 0, None)
+            extrapolated /= extrapolated.sum()
+            stepped = matrix.step(extrapolated, damping_factor)
+            if np.abs(stepped - extrapolated).sum() < np.abs(x2 - x1).sum():
+                ranks = stepped
+                history = [extrapolated, stepped]
+        yield ranks
+
+
+def linear_system(matrix, damping_factor):
+    """
+    Returns the sparse matrix I - damping_factor * links. PageRank is the
+    solution of (I - damping_factor * links) x = 1, normalised to sum to 1:
+    the teleport and dangling-page terms add the same amount to every page.
+    """
+    n = len(matrix)
+    return (sparse.identity(n, format="csr")
+            - damping_factor * matrix.links).tocsr()
+
+
+def gauss_seidel_iterates(matrix, damping_factor):
+    """
+    Gauss-Seidel sweeps over the linear system, each one a sparse
+    triangular solve that uses ranks already updated in the same sweep.
+    """
+    system = linear_system(matrix, damping_factor)
+    lower = sparse.tril(system, format="csr")
+    upper = sparse.triu(system, k=1, format="csr")
+    ones = np.ones(len(matrix))
+    solution = ones
+    while True:
+        solution = linalg.spsolve_triangular(
+            lower, ones - upper @ solution, lower=True
+        )
+        yield solution / solution.sum()
+
+
+def linear_iterates(matrix, damping_factor):
+    """
+    Solves the linear system directly with a sparse LU factorisation.
+    """
+    system = linear_system(matrix, damping_factor)
+    solution = linalg.spsolve(system.tocsc(), np.ones(len(matrix)))
+    yield solution / solution.sum()
+
+
+SOLVERS = {
+    "power": power_iterates,
+    "aitken": aitken_iterates,
+    "gauss-seidel": gauss_seidel_iterates,
+    "linear": linear_iterates
+}
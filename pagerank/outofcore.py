@@ -0,0 +1,120 @@
+import os
+import sys
+
+import numpy as np
+
+from matrix import MAX_ITERATIONS, TOLERANCE
+from pagerank import DAMPING
+
+# Edges processed per block during each sweep
+BLOCK = 1 << 22
+
+# Binary edge list: little-endian int32 (source, target) pairs
+EDGE = np.dtype("<i4")
+
+
+def main():
+    if len(sys.argv) == 5 and sys.argv[1] == "convert":
+        pages, edges = convert_edges(sys.argv[2], sys.argv[3], sys.argv[4])
+        print(f"Wrote {edges} links between {pages} pages")
+    elif len(sys.argv) in (4, 5) and sys.argv[1] == "rank":
+        top = int(sys.argv[4]) if len(sys.argv) == 5 else 10
+        with open(sys.argv[3], encoding="utf-8") as f:
+            names = [line.rstrip("\n") for line in f]
+        ranks = memmap_pagerank(sys.argv[2], DAMPING, len(names))
+        print(f"Top {top} of {len(names)} pages by PageRank")
+        for i in np.argsort(ranks)[::-1][:top]:
+            print(f"  {names[i]}: {ranks[i]:.6f}")
+    else:
+        sys.exit("Usage: python outofcore.py convert edges.tsv edges.bin names.txt\n"
+                 "       python outofcore.py rank edges.bin names.txt [top]")
+
+
+def convert_edges(tsv_path, edge_path, names_path):
+    """
+    Convert a "page<TAB>link" edge list, as written by
+    `crawler.crawl_to_edges`, into a binary edge list of page numbers plus
+    a file naming page i on line i. Edges are written in blocks, so only
+    the page names are ever held in memory.
+
+    Return (number of pages, number of links).
+    """
+    index = dict()
+    buffer = np.empty((BLOCK, 2), dtype=EDGE)
+    filled = 0
+    edges = 0
+
+    def number(page):
+        if page not in index:
+            index[page] = len(index)
+            names.write(f"{page}\n")
+        return index[page]
+
+    with open(tsv_path, encoding="utf-8") as lines, \
+            open(edge_path, "wb") as out, \
+            open(names_path, "w", encoding="utf-8") as names:
+        for line in lines:
+            page, _, link = line.rstrip("\n").partition("\t")
+            source = number(page)
+            if not link:
+                continue
+            buffer[filled] = (source, number(link))
+            filled += 1
+            edges += 1
+            if filled == BLOCK:
+                buffer.tofile(out)
+                filled = 0
+        buffer[:filled].tofile(out)
+    return len(index), edges
+
+
+def memmap_pagerank(edge_path, damping_factor, n=None,
+                    tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS):
+    """
+    Return an array of PageRank values for pages numbered 0 to n - 1 from a
+    binary edge list, by power iteration until the L1 change between sweeps
+    falls below `tolerance`.
+
+    The edge list is memory-mapped and read in blocks of BLOCK edges on
+    every sweep, so only the rank vectors and out-degrees stay in memory.
+    If `n` is not given, it is one more than the largest page number.
+    """
+    if os.path.getsize(edge_path) == 0:
+        # An empty file cannot be memory-mapped
+        edges = np.empty((0, 2), dtype=EDGE)
+    else:
+        edges = np.memmap(edge_path, dtype=EDGE, mode="r").reshape(-1, 2)
+
+    # One pass for the out-degrees, and the page count if needed
+    if n is None:
+        n = 0
+        for start in range(0, len(edges), BLOCK):
+            n = max(n, int(edges[start:start + BLOCK].max()) + 1)
+    degrees = np.zeros(n, dtype=np.int64)
+    for start in range(0, len(edges), BLOCK):
+        degrees += np.bincount(edges[start:start + BLOCK, 0], minlength=n)
+    dangling = degrees == 0
+    # Dangling pages pass nothing along links, so any divisor works
+    divisors = np.where(dangling, 1, degrees)
+
+    ranks = np.full(n, 1 / n)
+    for _ in range(max_iterations):
+        share = ranks / divisors
+        incoming = np.zeros(n)
+        for start in range(0, len(edges), BLOCK):
+            block = edges[start:start + BLOCK]
+            incoming += np.bincount(
+                block[:, 1], weights=share[block[:, 0]], minlength=n
+            )
+        new_ranks = (1 - damping_factor) / n + damping_factor * (
+            incoming + ranks[dangling].sum() / n
+        )
+        change = np.abs(new_ranks - ranks).sum()
+        ranks = new_ranks
+        if change < tolerance:
+            break
+    return ranks / ranks.sum()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,25 +2,58 @@ import os
 import random
 import re
 import sys
+import time
+
+from crawler import crawl_cached
 
 DAMPING = 0.85
 SAMPLES = 10000
 
 
 def main():
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python pagerank.py corpus")
-    corpus = crawl(sys.argv[1])
+    args = sys.argv[1:]
+    use_sparse = "--sparse" in args
+    if use_sparse:
+        args.remove("--sparse")
+    solver = None
+    if "--solver" in args:
+        i = args.index("--solver")
+        if i + 1 >= len(args):
+            sys.exit("--solver needs a name")
+        solver = args[i + 1]
+        del args[i:i + 2]
+        if use_sparse:
+            sys.exit("Choose either --sparse or --solver, not both")
+    if len(args) != 1:
+        sys.exit("Usage: python pagerank.py [--sparse | --solver name] corpus")
+    corpus = crawl_cached(args[0])
     ranks = sample_pagerank(corpus, DAMPING, SAMPLES)
     print(f"PageRank Results from Sampling (n = {SAMPLES})")
     for page in sorted(ranks):
         print(f"  {page}: {ranks[page]:.4f}")
-    ranks = iterate_pagerank(corpus, DAMPING)
+    if solver is not None:
+        # NumPy and SciPy are only needed for the sparse engines
+        from matrix import SOLVERS, solve_pagerank
+        if solver not in SOLVERS:
+            sys.exit(f"Unknown solver, choose from {', '.join(SOLVERS)}")
+        ranks, _ = solve_pagerank(corpus, DAMPING, solver,
+                                  callback=print_telemetry)
+    elif use_sparse:
+        from matrix import iterate_pagerank_sparse
+        ranks = iterate_pagerank_sparse(corpus, DAMPING)
+    else:
+        ranks = iterate_pagerank(corpus, DAMPING, callback=print_telemetry)
     print(f"PageRank Results from Iteration")
     for page in sorted(ranks):
         print(f"  {page}: {ranks[page]:.4f}")
 
 
+def print_telemetry(record):
+    print(f"  iteration {record['iteration']}: "
+          f"residual {record['residual']:.2e}, "
+          f"{record['seconds'] * 1000:.2f} ms")
+
+
 def crawl(directory):
     """
     Parse a directory of HTML pages and check for links to other pages.
@@ -86,36 +119,40 @@ def sample_pagerank(corpus, damping_factor, n):
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
     """
-    page_dict = corpus
-    prob_distribution = dict()
-    for key in page_dict:
-        prob_distribution.update({key: 0})
-
-    start_page_index = random.randint(0, len(page_dict)-1)
-    start_page = list(page_dict)[start_page_index]
-
+    # Precompute each page's links as page indices. The transition model is
+    # a mixture: with probability `damping_factor` follow a uniformly chosen
+    # link, otherwise (or from a page with no links) jump to a uniformly
+    # chosen page, so each step needs only two O(1) random draws.
+    pages = list(corpus)
+    index = {page: i for i, page in enumerate(pages)}
+    links = [tuple(index[link] for link in corpus[page]) for page in pages]
+    counts = [0] * len(pages)
+
+    rand = random.random
+    randrange = random.randrange
+    current = randrange(len(pages))
     for i in range(n):
-        possible_next_pages = transition_model(corpus, start_page, damping_factor)
-        random_selection = random.randint(0, 10000)/10000
-        cumulative_prob = 0
-        for key in possible_next_pages:
-            cumulative_prob += possible_next_pages.get(key)
-            if cumulative_prob >= random_selection:
-                prob_distribution.update({key: prob_distribution.get(key) + 1})
-                start_page = key
-                break
-                
-
-    for key in prob_distribution:
-        prob_distribution.update({key: prob_distribution.get(key)/n})
-    return prob_distribution
-    raise NotImplementedError
+        page_links = links[current]
+        if page_links and rand() < damping_factor:
+            current = page_links[randrange(len(page_links))]
+        else:
+            current = randrange(len(pages))
+        counts[current] += 1
+
+    return {page: counts[i] / n for i, page in enumerate(pages)}
 
 
-def iterate_pagerank(corpus, damping_factor):
+def iterate_pagerank(corpus, damping_factor, threshold=0.001, callback=None):
     """
     Return PageRank values for each page by iteratively updating
-    PageRank values until convergence.
+    PageRank values until no value changes by more than `threshold`.
+    This bounds the largest single change, unlike the L1 `tolerance` of
+    the sparse solvers in matrix.py.
+
+    If `callback` is given, it is called after every sweep with a
+    dictionary of the `iteration` number, the `residual` (the L1 change
+    over all pages in that sweep, as `matrix.solve_pagerank` reports)
+    and the `seconds` the sweep took.
 
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
@@ -126,8 +163,12 @@ def iterate_pagerank(corpus, damping_factor):
         prob_distribution.update({key: 1/len(corpus)})
     
     max_change = 1
-    while max_change > 0.001:
+    iteration = 0
+    while max_change > threshold:
+        start = time.perf_counter()
+        iteration += 1
         max_change = 0
+        total_change = 0
         for key in prob_distribution:
             sigma_term = 0
             pages_with_links = list()
@@ -144,8 +185,15 @@ def iterate_pagerank(corpus, damping_factor):
             new_value = ((1-damping_factor)/len(corpus)) + (damping_factor*sigma_term)
             if abs(old_value-new_value) > max_change:
                 max_change = abs(old_value-new_value)
+            total_change += abs(old_value-new_value)
             pages_with_links.clear()
             prob_distribution.update({key: new_value})
+        if callback is not None:
+            callback({
+                "iteration": iteration,
+                "residual": total_change,
+                "seconds": time.perf_counter() - start
+            })
 
     return prob_distribution
 
@@ -0,0 +1,108 @@
+import heapq
+import sys
+from collections import OrderedDict, deque
+
+from pagerank import DAMPING, crawl
+
+# Residual per link below which forward push stops expanding a page
+EPSILON = 1e-6
+
+# How many seed sets keep their results cached
+CACHE_SIZE = 128
+
+
+def main():
+    if len(sys.argv) < 3:
+        sys.exit("Usage: python personalized.py corpus seed [seed ...]")
+    corpus = crawl(sys.argv[1])
+    seeds = sys.argv[2:]
+    for seed in seeds:
+        if seed not in corpus:
+            sys.exit(f"{seed} is not in the corpus")
+    print(f"Personalized PageRank for {', '.join(seeds)}")
+    for page, rank in top_pages(corpus, seeds):
+        print(f"  {page}: {rank:.4f}")
+
+
+def personalized_pagerank(corpus, seeds, damping_factor=DAMPING,
+                          epsilon=EPSILON):
+    """
+    Return approximate personalized PageRank values for the random surfer
+    who, instead of jumping to any page, jumps back to a page chosen at
+    random from `seeds` (and does so from pages with no links too).
+
+    Uses forward push: rank flows out from the seeds only while a page's
+    undistributed residual exceeds `epsilon` per link, so the work done
+    depends on the neighbourhood of the seeds and not on the size of the
+    corpus. Pages never reached are left out of the returned dictionary.
+    """
+    seeds = list(dict.fromkeys(seeds))
+    ranks = dict()
+    residuals = {seed: 1 / len(seeds) for seed in seeds}
+    queue = deque(seeds)
+    queued = set(seeds)
+
+    while queue:
+        page = queue.popleft()
+        queued.discard(page)
+        amount = residuals.pop(page)
+        ranks[page] = ranks.get(page, 0) + (1 - damping_factor) * amount
+
+        # A page with no links hands its share back to the seeds
+        links = corpus[page] or seeds
+        share = damping_factor * amount / len(links)
+        for link in links:
+            residuals[link] = residuals.get(link, 0) + share
+            if (link not in queued
+                    and residuals[link] > epsilon * max(len(corpus[link]), 1)):
+                queue.append(link)
+                queued.add(link)
+    return ranks
+
+
+def top_pages(corpus, seeds, k=10, damping_factor=DAMPING, epsilon=EPSILON):
+    """
+    Return the `k` pages with the highest personalized PageRank for
+    `seeds`, as a list of (page, rank) pairs from highest to lowest.
+    """
+    ranks = personalized_pagerank(corpus, seeds, damping_factor, epsilon)
+    return heapq.nlargest(k, ranks.items(), key=lambda item: item[1])
+
+
+class PersonalizedRanker():
+    """
+    Answers personalized top-k queries over one corpus, keeping the
+    results for recently used seed sets in an LRU cache.
+    """
+    def __init__(self, corpus, damping_factor=DAMPING, epsilon=EPSILON,
+                 cache_size=CACHE_SIZE):
+        self.corpus = corpus
+        self.damping_factor = damping_factor
+        self.epsilon = epsilon
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def ranks(self, seeds):
+        key = frozenset(seeds)
+        if key in self.cache:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        self.misses += 1
+        ranks = personalized_pagerank(
+            self.corpus, sorted(key), self.damping_factor, self.epsilon
+        )
+        self.cache[key] = ranks
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return ranks
+
+    def top(self, seeds, k=10):
+        return heapq.nlargest(k, self.ranks(seeds).items(),
+                              key=lambda item: item[1])
+
+
+if __name__ == "__main__":
+    main()
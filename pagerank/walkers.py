@@ -0,0 +1,144 @@
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from pagerank import DAMPING, SAMPLES, crawl
+
+# Default number of independent random walkers
+WALKERS = 64
+
+# Steps drawn from each walker's random stream at a time
+BLOCK = 4096
+
+# Groups the walkers are dealt into; the spread between the groups' own
+# estimates gives the variance, with memory for one count per group and page
+BATCHES = 8
+
+# Link table shared by the walkers in each worker process
+table = None
+
+
+def main():
+    if len(sys.argv) not in (2, 3, 4):
+        sys.exit("Usage: python walkers.py corpus [walkers] [processes]")
+    corpus = crawl(sys.argv[1])
+    walkers = int(sys.argv[2]) if len(sys.argv) > 2 else WALKERS
+    processes = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    ranks, variance = sample_pagerank_parallel(
+        corpus, DAMPING, SAMPLES, walkers=walkers, processes=processes
+    )
+    print(f"PageRank Results from {walkers} Walkers (n = {SAMPLES})")
+    for page in sorted(ranks):
+        print(f"  {page}: {ranks[page]:.4f} ± {variance[page] ** 0.5:.4f}")
+
+
+def sample_pagerank_parallel(corpus, damping_factor, n, walkers=WALKERS,
+                             processes=None, seed=None):
+    """
+    Estimate PageRank with `walkers` independent random walks taking `n`
+    steps between them, each drawing from its own stream spawned from
+    `seed`. The walkers are split evenly over a pool of `processes` worker
+    processes (all cores by default, or this process if `processes` is 1),
+    and each worker steps its share together as NumPy arrays.
+
+    Return a pair of dictionaries keyed by page name: the merged PageRank
+    estimate, and the variance of that estimate computed from the spread
+    between BATCHES groups of walkers (batch means).
+    """
+    pages = list(corpus)
+    index = {page: i for i, page in enumerate(pages)}
+    degrees = np.array([len(corpus[page]) for page in pages], dtype=np.int64)
+    offsets = np.zeros(len(pages) + 1, dtype=np.int64)
+    np.cumsum(degrees, out=offsets[1:])
+    # One spare slot so that reading past a page's last link stays in bounds
+    links = np.array(
+        [index[link] for page in pages for link in corpus[page]] + [0],
+        dtype=np.int64
+    )
+
+    # Split the steps between walkers, and the walkers evenly between
+    # processes so that each steps as large a batch as possible
+    processes = processes or os.cpu_count()
+    walkers = max(1, min(walkers, n))
+    steps = np.full(walkers, n // walkers, dtype=np.int64)
+    steps[:n % walkers] += 1
+    streams = np.random.SeedSequence(seed).spawn(walkers)
+    batches = min(BATCHES, walkers)
+    groups = np.arange(walkers) % batches
+    size = -(-walkers // processes)
+    tasks = [
+        (streams[i:i + size], steps[i:i + size], groups[i:i + size], batches)
+        for i in range(0, walkers, size)
+    ]
+
+    initargs = (offsets, degrees, links, damping_factor)
+    if processes == 1:
+        init_worker(*initargs)
+        counts = sum(map(walk, tasks))
+    else:
+        with ProcessPoolExecutor(processes,
+                                 initializer=init_worker,
+                                 initargs=initargs) as pool:
+            counts = sum(pool.map(walk, tasks))
+
+    # Each group's own estimate, then their mean and its variance
+    estimates = counts / np.bincount(groups, weights=steps)[:, None]
+    ranks = counts.sum(axis=0) / n
+    if batches > 1:
+        variance = estimates.var(axis=0, ddof=1) / batches
+    else:
+        variance = np.full(len(pages), np.nan)
+    return (
+        {page: float(ranks[i]) for i, page in enumerate(pages)},
+        {page: float(variance[i]) for i, page in enumerate(pages)}
+    )
+
+
+def init_worker(offsets, degrees, links, damping_factor):
+    global table
+    table = (offsets, degrees, links, damping_factor)
+
+
+def walk(task):
+    """
+    Steps a batch of walkers together, each using its own random stream,
+    and returns a (batches, pages) array of how often the walkers in each
+    group visited each page.
+    """
+    offsets, degrees, links, damping_factor = table
+    streams, steps, groups, batches = task
+    pages = len(degrees)
+    walkers = len(streams)
+    generators = [np.random.default_rng(stream) for stream in streams]
+
+    counts = np.zeros(batches * pages, dtype=np.int64)
+    current = np.array([rng.integers(pages) for rng in generators])
+    for start in range(0, int(steps.max()), BLOCK):
+        block = int(min(BLOCK, steps.max() - start))
+
+        # Per walker and step: one draw picks link or jump, the other picks
+        # where to, interleaved so a stream is consumed the same way
+        # however its walker's steps are split into blocks
+        draws = np.stack([rng.random((block, 2)) for rng in generators])
+        visited = np.empty((block, walkers), dtype=np.int64)
+        for t in range(block):
+            choose, where = draws[:, t, 0], draws[:, t, 1]
+            degree = degrees[current]
+            follow = (choose < damping_factor) & (degree > 0)
+            link = links[offsets[current] + (where * degree).astype(np.int64)]
+            jump = (where * pages).astype(np.int64)
+            current = np.where(follow, link, jump)
+            visited[t] = current
+
+        # Walkers with fewer steps left stop counting early; adding visits
+        # one by one keeps the work per block down to the steps taken
+        active = (start + np.arange(block))[:, None] < steps[None, :]
+        np.add.at(counts, (visited + groups * pages)[active], 1)
+
+    return counts.reshape(batches, pages)
+
+
+if __name__ == "__main__":
+    main()
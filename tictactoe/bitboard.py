@@ -0,0 +1,181 @@
+"""
+Tic Tac Toe Player on bitboards
+
+A board is a pair of 9-bit integers (x, o), with bit 3 * i + j set when
+that player has a mark in row i, column j.
+"""
+
+import tictactoe as ttt
+
+X = ttt.X
+O = ttt.O
+EMPTY = ttt.EMPTY
+
+FULL = (1 << 9) - 1
+
+# Rows, columns and diagonals, as masks of their three cells
+WIN_MASKS = (
+    [0b111 << (3 * i) for i in range(3)]
+    + [0b001001001 << j for j in range(3)]
+    + [0b100010001, 0b001010100]
+)
+
+# Cells in the order alpha-beta tries them: centre, corners, edges
+MOVE_ORDER = [3 * i + j for i, j in ttt.MOVE_ORDER]
+
+# Positions searched by the last call to minimax
+nodesVisited = 0
+
+
+def toBits(board):
+    """
+    Returns the bitboard for a board in tictactoe's list format.
+    """
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == O:
+                o |= 1 << (3 * i + j)
+    return (x, o)
+
+
+def fromBits(bits):
+    """
+    Returns the board in tictactoe's list format for a bitboard.
+    """
+    x, o = bits
+    return [[X if x >> (3 * i + j) & 1 else O if o >> (3 * i + j) & 1
+             else EMPTY for j in range(3)] for i in range(3)]
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return (0, 0)
+
+
+def player(bits):
+    """
+    Returns player who has the next turn on a board.
+    """
+    x, o = bits
+    return X if x.bit_count() == o.bit_count() else O
+
+
+def actions(bits):
+    """
+    Returns the list of cells available on the board.
+    """
+    x, o = bits
+    return [cell for cell in range(9) if not (x | o) >> cell & 1]
+
+
+def result(bits, cell):
+    """
+    Returns the board that results from the next player marking `cell`.
+    """
+    x, o = bits
+    if (x | o) >> cell & 1:
+        raise ValueError("Invalid Action")
+    if x.bit_count() == o.bit_count():
+        return (x | 1 << cell, o)
+    return (x, o | 1 << cell)
+
+
+def wins(marks):
+    """
+    Returns True if `marks` cover a row, column or diagonal.
+    """
+    for mask in WIN_MASKS:
+        if marks & mask == mask:
+            return True
+    return False
+
+
+def winner(bits):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    x, o = bits
+    if wins(x):
+        return X
+    if wins(o):
+        return O
+    return None
+
+
+def terminal(bits):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    x, o = bits
+    return (x | o) == FULL or wins(x) or wins(o)
+
+
+def utility(bits):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    x, o = bits
+    if wins(x):
+        return 1
+    if wins(o):
+        return -1
+    return 0
+
+
+def minimax(board):
+    """
+    Returns the optimal action (i, j) for the current player on a board in
+    tictactoe's list format, so it can stand in for `tictactoe.minimax`.
+    Like it, the first optimal action in `tictactoe.actions` order is
+    returned, or None if the game is over.
+    """
+    global nodesVisited
+    nodesVisited = 0
+    x, o = toBits(board)
+    if x.bit_count() == o.bit_count():
+        mine, theirs = x, o
+    else:
+        mine, theirs = o, x
+    if wins(mine) or wins(theirs) or (mine | theirs) == FULL:
+        return None
+
+    best = -2
+    for cell in range(9):
+        if (mine | theirs) >> cell & 1:
+            continue
+        value = -negamax(theirs, mine | 1 << cell, -2, -best)
+        if value > best:
+            best = value
+            bestCell = cell
+        if best == 1:
+            break
+    return (bestCell // 3, bestCell % 3)
+
+
+def negamax(mine, theirs, alpha, beta):
+    """
+    Returns the value of the board for the player about to move, holding
+    `mine`, with `theirs` having just moved: 1 for a win, -1 for a loss
+    and 0 for a draw. Values outside (alpha, beta) are only bounds.
+    """
+    global nodesVisited
+    nodesVisited += 1
+    if wins(theirs):
+        return -1
+    taken = mine | theirs
+    if taken == FULL:
+        return 0
+    best = -2
+    for cell in MOVE_ORDER:
+        if taken >> cell & 1:
+            continue
+        best = max(best, -negamax(theirs, mine | 1 << cell, -beta, -alpha))
+        if best >= beta or best == 1:
+            return best
+        alpha = max(alpha, best)
+    return best
@@ -0,0 +1,85 @@
+import os
+import sys
+import time
+
+import tictactoe as ttt
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python book.py [book]")
+    path = sys.argv[1] if len(sys.argv) == 2 else ttt.BOOK
+
+    start = time.perf_counter()
+    positions = write_book(path)
+    print(f"Wrote {positions} positions to {path} "
+          f"({os.path.getsize(path)} bytes) in "
+          f"{time.perf_counter() - start:.2f} s")
+
+    # Startup: mapping the book, against solving the game for the table
+    ttt.book = None
+    start = time.perf_counter()
+    if not ttt.loadBook(path):
+        sys.exit(f"Could not load {path}")
+    print(f"Book loaded in {(time.perf_counter() - start) * 1e6:.0f} us")
+    ttt.transpositions.clear()
+    start = time.perf_counter()
+    ttt.minimax(ttt.initial_state(), useBook=False)
+    print(f"Transposition table solved in "
+          f"{(time.perf_counter() - start) * 1e6:.0f} us")
+
+    # Per move: the mean over every position the computer can face
+    boards = [board for board in reachable() if not ttt.terminal(board)]
+    for name, options in [("book", {}),
+                          ("table", {"useBook": False}),
+                          ("alpha-beta", {"useBook": False,
+                                          "useTable": False})]:
+        start = time.perf_counter()
+        for board in boards:
+            ttt.minimax(board, **options)
+        seconds = (time.perf_counter() - start) / len(boards)
+        print(f"{name:<11} {seconds * 1e6:>10.1f} us per move")
+
+
+def reachable():
+    """
+    Returns every board that can arise in a game, finished or not.
+    """
+    boards = dict()
+    frontier = [ttt.initial_state()]
+    while frontier:
+        board = frontier.pop()
+        index = ttt.bookIndex(board)
+        if index in boards:
+            continue
+        boards[index] = board
+        if not ttt.terminal(board):
+            for action in ttt.actions(board):
+                frontier.append(ttt.result(board, action))
+    return list(boards.values())
+
+
+def write_book(path):
+    """
+    Writes the opening book for every reachable unfinished board to
+    `path`, in the format `tictactoe.loadBook` reads, and returns how
+    many boards it holds.
+    """
+    entries = bytearray([ttt.NO_ENTRY]) * 3 ** 9
+    positions = 0
+    for board in reachable():
+        if ttt.terminal(board):
+            continue
+        i, j = ttt.minimax(board, useBook=False)
+        value = ttt.solve(board)
+        entries[ttt.bookIndex(board)] = (value + 1) << 4 | (3 * i + j)
+        positions += 1
+    with open(path + ".tmp", "wb") as f:
+        f.write(ttt.BOOK_MAGIC)
+        f.write(entries)
+    os.replace(path + ".tmp", path)
+    return positions
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""
+m,n,k-game Player
+
+Players take turns marking cells of an m-by-n board, and the first to get
+k marks in a row, column or diagonal wins. Tic Tac Toe is the 3,3,3-game.
+"""
+
+import sys
+import time
+
+from tictactoe import X, O, EMPTY
+
+# Seconds the computer may spend choosing a move
+BUDGET = 1.0
+
+# Only empty cells within this many steps of a mark are considered as moves
+RADIUS = 2
+
+# Searched positions between checks of the clock
+CHECK_EVERY = 256
+
+
+def main():
+    if len(sys.argv) not in (4, 5):
+        sys.exit("Usage: python mnk.py m n k [seconds per move]")
+    m, n, k = (int(arg) for arg in sys.argv[1:4])
+    budget = float(sys.argv[4]) if len(sys.argv) == 5 else BUDGET
+    game = Game(m, n, k)
+
+    # The computer plays both sides, reporting how long each move took
+    board = game.initial_state()
+    slowest = 0
+    while not game.terminal(board):
+        start = time.perf_counter()
+        action = game.bestMove(board, budget)
+        seconds = time.perf_counter() - start
+        slowest = max(slowest, seconds)
+        print(f"{game.player(board)} plays {action} after searching "
+              f"{game.nodes} positions to depth {game.depth} "
+              f"in {seconds:.3f} s")
+        board = game.result(board, action)
+    for row in board:
+        print(" ".join(cell or "." for cell in row))
+    winner = game.winner(board)
+    print(f"{winner} wins" if winner else "Tie",
+          f"(slowest move {slowest:.3f} s)")
+
+
+class Timeout(Exception):
+    pass
+
+
+class Game():
+    """
+    Rules and search for the m,n,k-game, with boards as lists of m rows of
+    n cells like Tic Tac Toe's.
+    """
+    def __init__(self, m=3, n=3, k=3):
+        if k > max(m, n):
+            raise ValueError("k must fit on the board")
+        self.m = m
+        self.n = n
+        self.k = k
+
+        # Every line of k cells, numbering cell (i, j) as n * i + j
+        self.windows = []
+        for di, dj in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+            for i in range(m):
+                for j in range(n):
+                    endI = i + di * (k - 1)
+                    endJ = j + dj * (k - 1)
+                    if 0 <= endI < m and 0 <= endJ < n:
+                        self.windows.append(
+                            [n * (i + di * s) + j + dj * s for s in range(k)]
+                        )
+        self.cellWindows = [[] for _ in range(m * n)]
+        for w, window in enumerate(self.windows):
+            for cell in window:
+                self.cellWindows[cell].append(w)
+
+        self.neighbours = [
+            [n * y + x
+             for y in range(max(0, i - RADIUS), min(m, i + RADIUS + 1))
+             for x in range(max(0, j - RADIUS), min(n, j + RADIUS + 1))
+             if (y, x) != (i, j)]
+            for i in range(m) for j in range(n)
+        ]
+
+        # A window holding only one player's marks is worth more to them
+        # the more marks it holds. A win is worth more than every window
+        # could be together, with room to value wins found sooner higher
+        self.win = len(self.windows) * 10 ** (k - 1) + m * n + 1
+        self.weights = [0] + [10 ** c for c in range(k - 1)] + [self.win]
+
+        self.nodes = 0
+        self.depth = 0
+
+    def initial_state(self):
+        """
+        Returns starting state of the board.
+        """
+        return [[EMPTY] * self.n for _ in range(self.m)]
+
+    def player(self, board):
+        """
+        Returns player who has the next turn on a board.
+        """
+        xCount = sum(row.count(X) for row in board)
+        oCount = sum(row.count(O) for row in board)
+        return X if xCount == oCount else O
+
+    def actions(self, board):
+        """
+        Returns the list of all possible actions (i, j) on the board.
+        """
+        return [(i, j) for i in range(self.m) for j in range(self.n)
+                if board[i][j] == EMPTY]
+
+    def result(self, board, action):
+        """
+        Returns the board that results from making move (i, j) on the board.
+        """
+        i, j = action
+        if board[i][j] is not EMPTY:
+            raise ValueError("Invalid Action")
+        newBoard = [list(row) for row in board]
+        newBoard[i][j] = self.player(board)
+        return newBoard
+
+    def winner(self, board):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        cells = [cell for row in board for cell in row]
+        for window in self.windows:
+            first = cells[window[0]]
+            if first is not EMPTY and all(cells[c] == first for c in window):
+                return first
+        return None
+
+    def terminal(self, board):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        return (self.winner(board) is not None
+                or all(cell is not EMPTY for row in board for cell in row))
+
+    def utility(self, board):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        winner = self.winner(board)
+        return 1 if winner == X else -1 if winner == O else 0
+
+    def bestMove(self, board, budget=BUDGET):
+        """
+        Returns the action (i, j) for the current player on the board, by
+        iterative deepening alpha-beta search until `budget` seconds have
+        passed or the outcome is known. Positions at the depth limit are
+        valued by `Position.score`.
+
+        The move kept is the best one from the deepest search that
+        finished, or from the unfinished one if it had already searched
+        the previous best move. A search to depth 1 always finishes.
+        `nodes` and `depth` record the positions searched and the depth
+        of the deepest finished search.
+        """
+        if self.terminal(board):
+            return None
+        position = Position(self, board)
+        self.nodes = 0
+        self.deadline = None
+        moves = position.candidates()
+        values = dict()
+        best = moves[0]
+        for depth in range(1, len(position.empty) + 1):
+            # Try the best moves from the last search first
+            moves.sort(key=lambda cell: values.get(cell, -self.win - 1),
+                       reverse=True)
+            alpha = -self.win - 1
+            try:
+                for cell in moves:
+                    values[cell] = self.searchMove(position, cell, depth,
+                                                   alpha, self.win + 1, 1)
+                    if values[cell] > alpha:
+                        alpha = values[cell]
+                        best = cell
+            except Timeout:
+                break
+            self.depth = depth
+            if abs(alpha) > self.win - len(position.empty) - 1:
+                break
+            if depth == 1:
+                self.deadline = position.start + budget
+            if time.perf_counter() > self.deadline:
+                break
+        return divmod(best, self.n)
+
+    def searchMove(self, position, cell, depth, alpha, beta, ply):
+        """
+        Returns the value of marking `cell` for the player making the move.
+        """
+        won = position.play(cell)
+        try:
+            if won:
+                return self.win - ply
+            if not position.empty:
+                return 0
+            return -self.negamax(position, depth - 1, -beta, -alpha, ply + 1)
+        finally:
+            position.undo(cell)
+
+    def negamax(self, position, depth, alpha, beta, ply):
+        """
+        Returns the value of the position for the player to move, searching
+        `depth` moves ahead. Values outside (alpha, beta) are only bounds.
+        """
+        self.nodes += 1
+        if (self.deadline is not None and self.nodes % CHECK_EVERY == 0
+                and time.perf_counter() > self.deadline):
+            raise Timeout
+        if depth == 0:
+            return position.score if position.turn == X else -position.score
+
+        moves = position.candidates()
+        if depth > 1:
+            moves.sort(key=position.gain, reverse=True)
+        best = -self.win - 1
+        for cell in moves:
+            best = max(best, self.searchMove(position, cell, depth,
+                                             alpha, beta, ply))
+            if best >= beta:
+                return best
+            alpha = max(alpha, best)
+        return best
+
+
+class Position():
+    """
+    A board being searched, updated in place as moves are made and undone.
+
+    For each window of k cells it keeps how many marks each player has
+    there, so that a win is detected from the windows through the last
+    move, and `score`, the heuristic value for X, is updated only for
+    those windows.
+    """
+    def __init__(self, game, board):
+        self.game = game
+        self.start = time.perf_counter()
+        self.cells = [cell for row in board for cell in row]
+        self.turn = game.player(board)
+        self.counts = {X: [0] * len(game.windows), O: [0] * len(game.windows)}
+        self.near = [0] * len(self.cells)
+        self.empty = set()
+        self.score = 0
+        for cell, mark in enumerate(self.cells):
+            if mark is EMPTY:
+                self.empty.add(cell)
+                continue
+            for w in game.cellWindows[cell]:
+                self.counts[mark][w] += 1
+            for other in game.neighbours[cell]:
+                self.near[other] += 1
+        for w in range(len(game.windows)):
+            self.score += self.value(w)
+
+    def value(self, w):
+        """
+        Returns what window `w` is worth to X.
+        """
+        x = self.counts[X][w]
+        o = self.counts[O][w]
+        if o == 0:
+            return self.game.weights[x]
+        if x == 0:
+            return -self.game.weights[o]
+        return 0
+
+    def candidates(self):
+        """
+        Returns the empty cells near a mark, or the centre of an empty board.
+        """
+        moves = [cell for cell in self.empty if self.near[cell]]
+        if not moves:
+            moves = [min(self.empty, key=self.fromCentre)]
+        return moves
+
+    def fromCentre(self, cell):
+        i, j = divmod(cell, self.game.n)
+        return abs(2 * i - self.game.m + 1) + abs(2 * j - self.game.n + 1)
+
+    def gain(self, cell):
+        """
+        Returns how much marking `cell` would improve the score for the
+        player to move, counting both their own windows and the opponent
+        windows it would block.
+        """
+        mine = self.counts[self.turn]
+        theirs = self.counts[O if self.turn == X else X]
+        weights = self.game.weights
+        total = 0
+        for w in self.game.cellWindows[cell]:
+            if theirs[w] == 0:
+                total += weights[mine[w] + 1] - weights[mine[w]]
+            elif mine[w] == 0:
+                total += weights[theirs[w]]
+        return total
+
+    def play(self, cell):
+        """
+        Marks `cell` for the player to move. Returns True if that wins.
+        """
+        mark = self.turn
+        counts = self.counts[mark]
+        won = False
+        for w in self.game.cellWindows[cell]:
+            self.score -= self.value(w)
+            counts[w] += 1
+            self.score += self.value(w)
+            if counts[w] == self.game.k:
+                won = True
+        for other in self.game.neighbours[cell]:
+            self.near[other] += 1
+        self.cells[cell] = mark
+        self.empty.discard(cell)
+        self.turn = O if mark == X else X
+        return won
+
+    def undo(self, cell):
+        """
+        Takes back the mark on `cell`, which must be the last one made.
+        """
+        mark = self.cells[cell]
+        counts = self.counts[mark]
+        for w in self.game.cellWindows[cell]:
+            self.score -= self.value(w)
+            counts[w] -= 1
+            self.score += self.value(w)
+        for other in self.game.neighbours[cell]:
+            self.near[other] -= 1
+        self.cells[cell] = EMPTY
+        self.empty.add(cell)
+        self.turn = mark
+
+
+if __name__ == "__main__":
+    main()
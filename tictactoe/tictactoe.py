@@ -3,11 +3,45 @@ Tic Tac Toe Player
 """
 
 import math
+import mmap
+import os
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Order in which alpha-beta tries moves: centre, then corners, then edges
+MOVE_ORDER = [(1, 1),
+              (0, 0), (0, 2), (2, 0), (2, 2),
+              (0, 1), (1, 0), (1, 2), (2, 1)]
+
+# Positions searched by the last call to minimax
+nodesVisited = 0
+
+# For each of the 8 rotations and reflections of the board, the cell
+# (numbered 3 * i + j) that ends up in each cell once it is applied
+SYMMETRIES = [
+    [3 * f(i, j)[0] + f(i, j)[1] for i in range(3) for j in range(3)]
+    for f in [lambda i, j: (i, j), lambda i, j: (2 - j, i),
+              lambda i, j: (2 - i, 2 - j), lambda i, j: (j, 2 - i),
+              lambda i, j: (i, 2 - j), lambda i, j: (2 - i, j),
+              lambda i, j: (j, i), lambda i, j: (2 - j, 2 - i)]
+]
+
+# Solved positions, keyed by canonicalKey: (minimax value, cells of the
+# optimal moves on the canonical board)
+transpositions = dict()
+
+# Opening book written by book.py: BOOK_MAGIC, then one byte for each
+# board by bookIndex, holding (value + 1) << 4 | cell of the first optimal
+# move, or NO_ENTRY for boards that are finished or cannot be reached
+BOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+BOOK_MAGIC = b"TTTB"
+NO_ENTRY = 0xFF
+
+# The memory-mapped opening book, once loadBook has found one
+book = None
+
 
 def initial_state():
     """
@@ -129,29 +163,68 @@ def utility(board):
     raise NotImplementedError
 
 
-def minimax(board):
+def minimax(board, useBook=True, useTable=True, alphaBeta=True):
     """
     Returns the optimal action for the current player on the board.
+
+    With `useBook`, the action is read from the opening book if one was
+    loaded and the board is in it. Otherwise, with `useTable`, the answer
+    is looked up in the transposition table, which is filled by solving
+    the whole game the first time it is needed, and None is returned for
+    a finished game. Otherwise, with `alphaBeta`, positions below each
+    move are searched with alpha-beta pruning and moves ordered by
+    MOVE_ORDER, or without it the full game tree is searched. Every way,
+    the first optimal action in `actions` order is returned, and
+    `nodesVisited` counts the positions the search looked at.
     """
+    global nodesVisited
+    nodesVisited = 0
+    if useBook and book is not None:
+        entry = book[len(BOOK_MAGIC) + bookIndex(board)]
+        if entry != NO_ENTRY:
+            return ((entry & 0xF) // 3, (entry & 0xF) % 3)
+    if useTable:
+        key, symmetry = canonicalKey(board)
+        if key not in transpositions:
+            solve(initial_state())
+        if not transpositions[key][1]:
+            return None
+        # The first optimal cell of the board itself is its first optimal
+        # action in `actions` order
+        cell = min(SYMMETRIES[symmetry][move]
+                   for move in transpositions[key][1])
+        return (cell // 3, cell % 3)
     if player(board) == X:
         v = -2
         for action in actions(board):
-            v2 =  max(v,minValue(result(board,action)))
+            if alphaBeta:
+                v2 = alphaBetaMin(result(board, action), v, 2)
+            else:
+                v2 =  max(v,minValue(result(board,action)))
             if v < v2:
                 v = v2
                 bestAction = action
+            if alphaBeta and v == 1:
+                break
         return bestAction
     else:
         v = 2
         for action in actions(board):
-            v2 = min(v,maxValue(result(board,action)))
+            if alphaBeta:
+                v2 = alphaBetaMax(result(board, action), -2, v)
+            else:
+                v2 = min(v,maxValue(result(board,action)))
             if v > v2:
                 v = v2
                 bestAction = action
+            if alphaBeta and v == -1:
+                break
         return bestAction
     raise NotImplementedError
 
 def maxValue(board):
+    global nodesVisited
+    nodesVisited += 1
     v = -2
     if terminal(board):
         return utility(board)
@@ -160,6 +233,8 @@ def maxValue(board):
     return v
 
 def minValue(board):
+    global nodesVisited
+    nodesVisited += 1
     v = 2
     if terminal(board):
         return utility(board)
@@ -167,5 +242,113 @@ def minValue(board):
         v = min(v, maxValue(result(board,action)))
     return v
 
-            
-   
+def orderedActions(board):
+    """
+    Returns the possible actions on the board in MOVE_ORDER.
+    """
+    return [action for action in MOVE_ORDER
+            if board[action[0]][action[1]] == EMPTY]
+
+def alphaBetaMax(board, alpha, beta):
+    """
+    Returns the value of the board for X, or a bound on it: at most
+    `alpha` if X cannot do better than `alpha`, at least `beta` if O
+    would never allow this board.
+    """
+    global nodesVisited
+    nodesVisited += 1
+    if terminal(board):
+        return utility(board)
+    v = -2
+    for action in orderedActions(board):
+        v = max(v, alphaBetaMin(result(board, action), alpha, beta))
+        # A win is the best X can do, so the other moves need no search
+        if v >= beta or v == 1:
+            return v
+        alpha = max(alpha, v)
+    return v
+
+def alphaBetaMin(board, alpha, beta):
+    """
+    Returns the value of the board for X, or a bound on it, with O to
+    move; see alphaBetaMax.
+    """
+    global nodesVisited
+    nodesVisited += 1
+    if terminal(board):
+        return utility(board)
+    v = 2
+    for action in orderedActions(board):
+        v = min(v, alphaBetaMax(result(board, action), alpha, beta))
+        if v <= alpha or v == -1:
+            return v
+        beta = min(beta, v)
+    return v
+
+def canonicalKey(board):
+    """
+    Returns the board under whichever symmetry makes it smallest, as a
+    tuple of its cells, together with the index of that symmetry in
+    SYMMETRIES. Boards that are rotations or reflections of each other
+    have the same key.
+    """
+    cells = [board[i][j] or "" for i in range(3) for j in range(3)]
+    return min(
+        (tuple(cells[cell] for cell in SYMMETRIES[s]), s)
+        for s in range(len(SYMMETRIES))
+    )
+
+def solve(board):
+    """
+    Returns the minimax value of the board, storing it with the optimal
+    moves of every position below it in the transposition table.
+    """
+    global nodesVisited
+    key, symmetry = canonicalKey(board)
+    if key in transpositions:
+        return transpositions[key][0]
+    nodesVisited += 1
+    if terminal(board):
+        transpositions[key] = (utility(board), ())
+        return utility(board)
+
+    values = {action: solve(result(board, action)) for action in actions(board)}
+    best = max(values.values()) if player(board) == X else min(values.values())
+    # Optimal moves are stored as cells of the canonical board
+    cells = SYMMETRIES[symmetry]
+    transpositions[key] = (best, tuple(sorted(
+        cells.index(3 * i + j)
+        for (i, j), value in values.items() if value == best
+    )))
+    return best
+
+def bookIndex(board):
+    """
+    Returns the board read as a base-3 number, with cell 3 * i + j as
+    its digit for 3 ** (3 * i + j): 0 if empty, 1 for X and 2 for O.
+    """
+    index = 0
+    for cell in range(8, -1, -1):
+        mark = board[cell // 3][cell % 3]
+        index = 3 * index + (0 if mark == EMPTY else 1 if mark == X else 2)
+    return index
+
+def loadBook(path=BOOK):
+    """
+    Memory-maps the opening book at `path` for minimax to answer from.
+    Returns False, leaving minimax to search, if there is no valid book.
+    """
+    global book
+    try:
+        with open(path, "rb") as f:
+            contents = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return False
+    if (contents[:len(BOOK_MAGIC)] != BOOK_MAGIC
+            or len(contents) != len(BOOK_MAGIC) + 3 ** 9):
+        contents.close()
+        return False
+    book = contents
+    return True
+
+loadBook()